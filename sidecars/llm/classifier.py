@@ -14,7 +14,7 @@ from __future__ import annotations
 
 import re
 from dataclasses import dataclass
-from typing import List, Protocol, runtime_checkable
+from typing import List, Optional, Protocol, runtime_checkable
 
 from config import AppConfig, settings
 
@@ -23,15 +23,30 @@ from config import AppConfig, settings
 # Keyword lists
 # ---------------------------------------------------------------------------
 
-def _keyword_match(keyword: str, text: str) -> bool:
+def _compile_keywords(keywords: List[str]) -> "re.Pattern[str]":
     """
-    Return True if `keyword` appears in `text` as a whole word / phrase.
+    Compile a keyword list into a single pattern scanned in one pass.
     Uses regex word boundaries (\b) so that e.g. 'quoi' does NOT match 'pourquoi'.
     Multi-word phrases are matched literally between word boundaries.
+    Each match is a zero-width lookahead, so overlapping keywords
+    (e.g. 'quoi' inside "c'est quoi") are all reported.
     """
-    # Escape the keyword for regex, then wrap in word boundaries
-    pattern = r"\b" + re.escape(keyword) + r"\b"
-    return bool(re.search(pattern, text, re.IGNORECASE | re.UNICODE))
+    alternation = "|".join(re.escape(kw) for kw in keywords)
+    return re.compile(r"(?=\b(" + alternation + r")\b)", re.IGNORECASE | re.UNICODE)
+
+
+def _first_keyword(pattern: "re.Pattern[str]", keywords: List[str], text: str) -> Optional[str]:
+    """
+    Return the earliest keyword in `keywords` (list order = priority) that
+    `pattern` finds in `text`, or None.
+    """
+    found = {m.group(1).lower() for m in pattern.finditer(text)}
+    if not found:
+        return None
+    for kw in keywords:
+        if kw in found:
+            return kw
+    return None
 
 
 FAST_KEYWORDS: List[str] = [
@@ -44,6 +59,9 @@ FULL_KEYWORDS: List[str] = [
     "quelle est la différence", "pros and cons", "débat",
 ]
 
+_FAST_PATTERN = _compile_keywords(FAST_KEYWORDS)
+_FULL_PATTERN = _compile_keywords(FULL_KEYWORDS)
+
 
 # ---------------------------------------------------------------------------
 # Result dataclass
@@ -110,20 +128,20 @@ class HeuristicClassifier:
             )
 
         # --- Rule 2: conversational keyword → fast -------------------------
-        for kw in FAST_KEYWORDS:
-            if _keyword_match(kw, message_lower):
-                return ClassificationResult(
-                    model_key="fast",
-                    reason=f"conversational keyword '{kw}' detected → fast",
-                )
+        kw = _first_keyword(_FAST_PATTERN, FAST_KEYWORDS, message_lower)
+        if kw is not None:
+            return ClassificationResult(
+                model_key="fast",
+                reason=f"conversational keyword '{kw}' detected → fast",
+            )
 
         # --- Rule 3: complexity keyword → full -----------------------------
-        for kw in FULL_KEYWORDS:
-            if _keyword_match(kw, message_lower):
-                return ClassificationResult(
-                    model_key="full",
-                    reason=f"complexity keyword '{kw}' detected → full",
-                )
+        kw = _first_keyword(_FULL_PATTERN, FULL_KEYWORDS, message_lower)
+        if kw is not None:
+            return ClassificationResult(
+                model_key="full",
+                reason=f"complexity keyword '{kw}' detected → full",
+            )
 
         # --- Rule 4: short message → fast ----------------------------------
         fast_threshold = self._config.classifier.fast_threshold_words
@@ -47,6 +47,8 @@ class ClassifierConfig(BaseModel):
 
 class MemoryConfig(BaseModel):
     chat_top_k: int = 5  # memories injected into the prompt per /chat request
+    query_cache_size: int = 128        # cached searches per user (0 = disabled)
+    query_cache_tolerance: float = 0.05  # hit when cosine(query, cached) >= 1 - tolerance
 
 
 class UserProfileConfig(BaseModel):
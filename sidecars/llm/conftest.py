@@ -0,0 +1,36 @@
+"""
+Shared pytest fixtures for the LLM Sidecar tests.
+
+ChromaDB + embedder setup is the expensive part of the suite, so the
+temporary store and the ChromaMemory instance are created once per
+test session and shared by test_memory.py and test_inference.py.
+"""
+from __future__ import annotations
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+import pytest
+
+from config import AppConfig, load_config
+
+
+@pytest.fixture(scope="session")
+def tmp_config() -> AppConfig:
+    """Config pointing to a temporary directory for ChromaDB."""
+    tmpdir = tempfile.TemporaryDirectory()
+    cfg = load_config()
+    # Override chromadb path to temp dir
+    cfg.chromadb.path = tmpdir.name
+    yield cfg
+    tmpdir.cleanup()
+
+
+@pytest.fixture(scope="session")
+def mem(tmp_config):
+    """ChromaMemory instance backed by the session's temp storage."""
+    from memory import ChromaMemory
+    return ChromaMemory(tmp_config)
@@ -78,10 +78,11 @@ class InferenceEngine:
     # ------------------------------------------------------------------
 
     async def start(self) -> None:
-        """Initialize the async HTTP client."""
+        """Initialize the async HTTP client (keep-alive pool shared by /chat and /health)."""
         self._http_client = httpx.AsyncClient(
             base_url=self._config.ollama.base_url,
             timeout=self._config.ollama.timeout_seconds,
+            limits=httpx.Limits(max_connections=32, max_keepalive_connections=32),
         )
 
     async def stop(self) -> None:
@@ -141,6 +142,15 @@ class InferenceEngine:
             user_id=user_id,
         )
 
+    async def warmup(self, user_id: str = "dad") -> None:
+        """
+        Run the classify + memory retrieval steps once with a dummy message,
+        without calling Ollama. Moves embedder load / first-encode costs
+        to startup instead of the first /chat request.
+        """
+        self._classifier.classify(user_id, "ping")
+        self._memory.search(user_id=user_id, query="ping", top_k=1)
+
     async def check_ollama_health(self) -> Dict[str, Any]:
         """Check Ollama availability and list available models."""
         if self._http_client is None:
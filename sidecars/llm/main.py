@@ -17,8 +17,8 @@ import logging
 from contextlib import asynccontextmanager
 from typing import Any, Dict, List, Optional
 
-from fastapi import FastAPI, HTTPException, Query
-from pydantic import BaseModel, Field
+from fastapi import BackgroundTasks, FastAPI, HTTPException, Query
+from pydantic import BaseModel, Field, field_validator
 
 from classifier import get_classifier
 from config import settings
@@ -59,6 +59,16 @@ async def lifespan(app: FastAPI):
     engine = InferenceEngine(config=settings, memory=memory_store)
     await engine.start()
 
+    # Preconnect: opens the pooled keep-alive connection before the first /chat
+    ollama_info = await engine.check_ollama_health()
+    logger.info("Ollama %s at %s", ollama_info["status"], settings.ollama.base_url)
+
+    logger.info("Warming up embedding model...")
+    try:
+        await engine.warmup()
+    except Exception as exc:
+        logger.warning("Warmup failed (first request will be slower): %s", exc)
+
     logger.info("LLM Sidecar ready on port %d", settings.server.port)
     yield
 
@@ -100,12 +110,37 @@ class ChatResponse(BaseModel):
     user_id: str
 
 
+# Scalar types ChromaDB accepts as metadata values (bool is checked by exact type).
+# List values are rejected: older ChromaDB releases allowed by requirements.txt
+# don't support them.
+_METADATA_SCALARS = (str, int, float, bool)
+# Keys ChromaDB reserves for itself
+_RESERVED_METADATA_KEYS = {"chroma:document"}
+_RESERVED_METADATA_PREFIXES = ("#", "$")
+
+
 class MemoryAddRequest(BaseModel):
     user_id: str
     content: str
     source: str = "conversation"
     metadata: Optional[Dict[str, Any]] = Field(default_factory=dict)
 
+    @field_validator("metadata")
+    @classmethod
+    def _check_metadata(cls, metadata: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """
+        Reject metadata ChromaDB would refuse, before the write is queued:
+        keys must be non-empty and not reserved, values must be str/int/float/bool.
+        """
+        for key, value in (metadata or {}).items():
+            if not key:
+                raise ValueError("metadata keys must be non-empty strings")
+            if key in _RESERVED_METADATA_KEYS or key.startswith(_RESERVED_METADATA_PREFIXES):
+                raise ValueError(f"metadata key '{key}' is reserved")
+            if type(value) not in _METADATA_SCALARS:
+                raise ValueError(f"metadata['{key}'] must be a str, int, float or bool")
+        return metadata
+
 
 class MemoryAddResponse(BaseModel):
     id: str
@@ -166,23 +201,51 @@ async def chat(request: ChatRequest) -> ChatResponse:
     return ChatResponse(**result.to_dict())
 
 
-@app.post("/memory/add", response_model=MemoryAddResponse)
-async def memory_add(request: MemoryAddRequest) -> MemoryAddResponse:
-    """Add a memory entry to a user's collection."""
+def _write_memory(
+    entry_id: str,
+    user_id: str,
+    content: str,
+    source: str,
+    metadata: Dict[str, Any],
+) -> None:
+    """Background task: embed and persist a memory entry queued by /memory/add."""
+    try:
+        memory_store.add(
+            user_id=user_id,
+            content=content,
+            source=source,
+            metadata=metadata,
+            entry_id=entry_id,
+        )
+    except Exception:
+        logger.exception("Failed to write memory '%s' for user '%s'", entry_id, user_id)
+
+
+@app.post("/memory/add", response_model=MemoryAddResponse, status_code=202)
+async def memory_add(
+    request: MemoryAddRequest,
+    background_tasks: BackgroundTasks,
+) -> MemoryAddResponse:
+    """
+    Queue a memory entry for a user's collection.
+    The ID is returned immediately; embedding and the ChromaDB write
+    run after the response has been sent.
+    """
     if request.user_id not in VALID_USER_IDS:
         raise HTTPException(status_code=400, detail=f"Unknown user_id: '{request.user_id}'")
 
-    try:
-        entry_id = memory_store.add(
-            user_id=request.user_id,
-            content=request.content,
-            source=request.source,
-            metadata=request.metadata or {},
-        )
-    except Exception as exc:
-        raise HTTPException(status_code=500, detail=str(exc)) from exc
+    # Reserved, so a DELETE arriving before the write lands still finds it
+    entry_id = memory_store.reserve_entry_id(request.user_id)
+    background_tasks.add_task(
+        _write_memory,
+        entry_id=entry_id,
+        user_id=request.user_id,
+        content=request.content,
+        source=request.source,
+        metadata=request.metadata or {},
+    )
 
-    return MemoryAddResponse(id=entry_id, status="added")
+    return MemoryAddResponse(id=entry_id, status="queued")
 
 
 @app.post("/memory/search", response_model=MemorySearchResponse)
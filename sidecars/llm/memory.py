@@ -9,19 +9,36 @@ Embeddings are generated locally with sentence-transformers (all-MiniLM-L6-v2).
 from __future__ import annotations
 
 import os
+import secrets
+import threading
+import time
 import uuid
+from collections import OrderedDict
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 import chromadb
+import numpy as np
 from chromadb.config import Settings as ChromaSettings
 
 # Allow injecting a mock embedder in tests via environment variable
 _MOCK_EMBEDDINGS = os.environ.get("LLM_SIDECAR_MOCK_EMBEDDINGS", "0") == "1"
 
 if not _MOCK_EMBEDDINGS:
+    # Split CPU cores across uvicorn workers (WEB_CONCURRENCY) so the
+    # encoder's OpenMP/MKL pools don't oversubscribe. Must be set before
+    # torch is imported; explicit env values take precedence.
+    _EMBED_THREADS = max(
+        1, (os.cpu_count() or 1) // max(1, int(os.environ.get("WEB_CONCURRENCY", "1")))
+    )
+    os.environ.setdefault("OMP_NUM_THREADS", str(_EMBED_THREADS))
+    os.environ.setdefault("MKL_NUM_THREADS", os.environ["OMP_NUM_THREADS"])
+
+    import torch
     from sentence_transformers import SentenceTransformer
 
+    torch.set_num_threads(int(os.environ["OMP_NUM_THREADS"]))
+
 from config import AppConfig, settings as app_settings
 
 
@@ -32,6 +49,29 @@ from config import AppConfig, settings as app_settings
 SHARED_COLLECTION = "memory_shared"
 VALID_USER_IDS = {"dad", "mom", "teen", "child"}
 
+# Embeddings are unit-norm, so inner product == cosine similarity and HNSW
+# can skip the norm computation per candidate. Collections created before
+# this setting keep ChromaDB's default "l2" space.
+HNSW_SPACE = "ip"
+
+
+# ---------------------------------------------------------------------------
+# IDs
+# ---------------------------------------------------------------------------
+
+def _uuid7() -> uuid.UUID:
+    """
+    Time-ordered UUID (RFC 9562 version 7).
+    48-bit millisecond timestamp followed by random bits, so consecutive
+    inserts get adjacent keys in ChromaDB's SQLite indexes.
+    """
+    value = ((time.time_ns() // 1_000_000) & ((1 << 48) - 1)) << 80
+    value |= secrets.randbits(80)
+    # Overwrite the version (4 bits) and variant (2 bits) fields
+    value = (value & ~(0xF << 76)) | (0x7 << 76)
+    value = (value & ~(0x3 << 62)) | (0x2 << 62)
+    return uuid.UUID(int=value)
+
 
 # ---------------------------------------------------------------------------
 # Memory entry schema (typed dict for clarity)
@@ -46,6 +86,89 @@ class MemoryEntry(dict):
     metadata: Dict[str, Any]
 
 
+# ---------------------------------------------------------------------------
+# Query cache
+# ---------------------------------------------------------------------------
+
+class QueryCache:
+    """
+    Bounded LRU of search results keyed on the (unit-norm) query embedding.
+
+    A lookup hits when a cached query has cosine similarity >= 1 - tolerance
+    with the new one, so near-identical rephrasings reuse the same results.
+    Callers must clear() it after the underlying collections change. Each
+    clear() bumps `generation`; read it before querying ChromaDB and pass it
+    to put(), which drops results computed across a concurrent write.
+    """
+
+    def __init__(self, capacity: int = 128, tolerance: float = 0.05) -> None:
+        self.capacity = capacity
+        self.tolerance = tolerance
+        self._entries: "OrderedDict[int, Tuple[np.ndarray, int, List[Dict[str, Any]]]]" = OrderedDict()
+        self._next_key = 0
+        # Stacked query vectors (row i ↔ _keys[i]); rebuilt lazily after changes
+        self._keys: List[int] = []
+        self._matrix: Optional[np.ndarray] = None
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    @property
+    def generation(self) -> int:
+        """Incremented by every clear()."""
+        with self._lock:
+            return self._generation
+
+    def get(self, query_vec: np.ndarray, top_k: int) -> Optional[List[Dict[str, Any]]]:
+        """Return cached results for a similar query, or None on a miss."""
+        with self._lock:
+            if not self._entries:
+                return None
+            if self._matrix is None:
+                self._keys = list(self._entries)
+                self._matrix = np.stack([self._entries[k][0] for k in self._keys])
+
+            sims = self._matrix @ query_vec
+            idx = int(np.argmax(sims))
+            if sims[idx] < 1.0 - self.tolerance:
+                return None
+
+            key = self._keys[idx]
+            _, cached_top_k, results = self._entries[key]
+            # A larger cached top_k still contains the exact top-`top_k` prefix
+            if cached_top_k < top_k:
+                return None
+            self._entries.move_to_end(key)
+            return [dict(r) for r in results[:top_k]]
+
+    def put(
+        self,
+        query_vec: np.ndarray,
+        top_k: int,
+        results: List[Dict[str, Any]],
+        generation: int,
+    ) -> None:
+        """
+        Cache `results` for `query_vec`, evicting the least recently used entry.
+        Skipped if the cache was cleared since `generation` was read.
+        """
+        if self.capacity <= 0:
+            return
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._entries[self._next_key] = (query_vec, top_k, [dict(r) for r in results])
+            self._next_key += 1
+            if len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+            self._matrix = None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._matrix = None
+            self._generation += 1
+
+
 # ---------------------------------------------------------------------------
 # ChromaMemory
 # ---------------------------------------------------------------------------
@@ -83,6 +206,22 @@ class ChromaMemory:
             self._embedder = _MockEmbedder()
         else:
             self._embedder = SentenceTransformer(config.embeddings.model)
+        # Entry IDs per collection — lets delete() skip a ChromaDB lookup
+        self._known_ids: Dict[str, Set[str]] = {}
+        # Reserved-but-unwritten entry ID → target collection; None marks
+        # an entry deleted before its write landed (the write is dropped)
+        self._pending: Dict[str, Optional[str]] = {}
+        self._pending_lock = threading.Lock()
+        # HNSW distance space per collection ("ip" or legacy "l2")
+        self._spaces: Dict[str, str] = {}
+        # Per-user similarity cache in front of search()
+        self._query_caches: Dict[str, QueryCache] = {
+            uid: QueryCache(
+                capacity=config.memory.query_cache_size,
+                tolerance=config.memory.query_cache_tolerance,
+            )
+            for uid in VALID_USER_IDS
+        }
         # Pre-create all known collections so they always exist
         self._ensure_collections()
 
@@ -95,40 +234,90 @@ class ChromaMemory:
         return f"memory_{user_id}"
 
     def _ensure_collections(self) -> None:
-        """Create collections for all known users + shared if missing."""
-        for uid in VALID_USER_IDS:
-            self._client.get_or_create_collection(self._collection_name(uid))
-        self._client.get_or_create_collection(SHARED_COLLECTION)
+        """
+        Create collections for all known users + shared if missing,
+        and index the IDs they already contain.
+        """
+        names = [self._collection_name(uid) for uid in VALID_USER_IDS]
+        names.append(SHARED_COLLECTION)
+        for name in names:
+            col = self._client.get_or_create_collection(
+                name, metadata={"hnsw:space": HNSW_SPACE}
+            )
+            self._known_ids[name] = set(col.get(include=[])["ids"])
+            self._spaces[name] = (col.metadata or {}).get("hnsw:space", "l2")
 
     def _embed(self, text: str) -> List[float]:
         """Generate a single embedding vector."""
-        result = self._embedder.encode(text, normalize_embeddings=True)
-        # SentenceTransformer returns numpy array; mock returns list
-        return result.tolist() if hasattr(result, "tolist") else list(result)
+        if _MOCK_EMBEDDINGS:
+            return list(self._embedder.encode(text, normalize_embeddings=True))
+        # inference_mode skips autograd version/view tracking during encode
+        with torch.inference_mode():
+            result = self._embedder.encode(
+                text, normalize_embeddings=True, convert_to_numpy=True
+            )
+        return result.tolist()
 
     def _get_collection(self, name: str):
         """Retrieve an existing ChromaDB collection by name."""
         return self._client.get_collection(name)
 
+    def _invalidate_query_cache(self, collection_name: str) -> None:
+        """Drop cached searches that may read from `collection_name`."""
+        if collection_name == SHARED_COLLECTION:
+            for cache in self._query_caches.values():
+                cache.clear()
+            return
+        user_id = collection_name[len("memory_"):]
+        if user_id in self._query_caches:
+            self._query_caches[user_id].clear()
+
     # ------------------------------------------------------------------
     # Public API
     # ------------------------------------------------------------------
 
+    @staticmethod
+    def new_entry_id() -> str:
+        """
+        Generate a fresh memory entry ID.
+        Lets callers hand the ID back before the entry is actually written.
+        IDs are time-ordered (UUIDv7) for better index locality.
+        """
+        return str(_uuid7())
+
+    def reserve_entry_id(self, user_id: str) -> str:
+        """
+        Generate an entry ID for a write that will run later via
+        add(entry_id=...). Until then, delete() of that ID succeeds and
+        the queued write is skipped.
+        """
+        if user_id not in VALID_USER_IDS and user_id != "shared":
+            raise ValueError(f"Unknown user_id: '{user_id}'")
+        entry_id = self.new_entry_id()
+        collection_name = (
+            SHARED_COLLECTION if user_id == "shared"
+            else self._collection_name(user_id)
+        )
+        with self._pending_lock:
+            self._pending[entry_id] = collection_name
+        return entry_id
+
     def add(
         self,
         user_id: str,
         content: str,
         source: str = "conversation",
         metadata: Optional[Dict[str, Any]] = None,
+        entry_id: Optional[str] = None,
     ) -> str:
         """
         Add a memory entry to the user's private collection.
-        Returns the generated UUID for the entry.
+        Returns the entry ID — `entry_id` if given, otherwise a generated one.
         """
         if user_id not in VALID_USER_IDS and user_id != "shared":
             raise ValueError(f"Unknown user_id: '{user_id}'")
 
-        entry_id = str(uuid.uuid4())
+        entry_id = entry_id or self.new_entry_id()
         timestamp = datetime.now(tz=timezone.utc).isoformat()
         doc_metadata = {
             "user_id": user_id,
@@ -142,14 +331,26 @@ class ChromaMemory:
             else self._collection_name(user_id)
         )
         collection = self._get_collection(collection_name)
-        embedding = self._embed(content)
-
-        collection.add(
-            ids=[entry_id],
-            embeddings=[embedding],
-            documents=[content],
-            metadatas=[doc_metadata],
-        )
+        try:
+            embedding = self._embed(content)
+        except Exception:
+            with self._pending_lock:
+                self._pending.pop(entry_id, None)
+            raise
+
+        # Held across the write so a concurrent delete() either tombstones
+        # the pending ID first or finds it in _known_ids afterwards
+        with self._pending_lock:
+            if entry_id in self._pending and self._pending.pop(entry_id) is None:
+                return entry_id
+            collection.add(
+                ids=[entry_id],
+                embeddings=[embedding],
+                documents=[content],
+                metadatas=[doc_metadata],
+            )
+            self._known_ids[collection_name].add(entry_id)
+        self._invalidate_query_cache(collection_name)
         return entry_id
 
     def search(
@@ -161,15 +362,25 @@ class ChromaMemory:
         """
         Search the user's private collection + memory_shared.
         Returns a merged, deduplicated list sorted by relevance score (desc).
+        Near-identical repeat queries are served from the user's QueryCache.
         """
         if user_id not in VALID_USER_IDS:
             raise ValueError(f"Unknown user_id: '{user_id}'")
 
         query_embedding = self._embed(query)
+        query_vec = np.asarray(query_embedding, dtype=np.float32)
+        cache = self._query_caches[user_id]
+        cached = cache.get(query_vec, top_k)
+        if cached is not None:
+            return cached
+        # Read before querying: a write landing mid-search bumps it
+        generation = cache.generation
+
         results: List[Dict[str, Any]] = []
 
         # Search user-specific collection
-        user_col = self._get_collection(self._collection_name(user_id))
+        user_col_name = self._collection_name(user_id)
+        user_col = self._get_collection(user_col_name)
         user_count = user_col.count()
         if user_count > 0:
             user_res = user_col.query(
@@ -177,7 +388,7 @@ class ChromaMemory:
                 n_results=min(top_k, user_count),
                 include=["documents", "metadatas", "distances"],
             )
-            results.extend(self._format_results(user_res))
+            results.extend(self._format_results(user_res, self._spaces[user_col_name]))
 
         # Search shared collection
         shared_col = self._get_collection(SHARED_COLLECTION)
@@ -188,31 +399,42 @@ class ChromaMemory:
                 n_results=min(top_k, shared_count),
                 include=["documents", "metadatas", "distances"],
             )
-            results.extend(self._format_results(shared_res))
+            results.extend(self._format_results(shared_res, self._spaces[SHARED_COLLECTION]))
 
         # Sort by score descending and cap at top_k
         results.sort(key=lambda r: r["score"], reverse=True)
-        return results[:top_k]
+        results = results[:top_k]
+        cache.put(query_vec, top_k, results, generation)
+        return results
 
     def delete(self, user_id: str, memory_id: str) -> bool:
         """
         Delete a memory entry by ID from the user's collection.
         Also checks shared collection.
+        Lookups go through the in-memory ID index, so an unknown ID
+        returns without any ChromaDB call. An ID reserved for a queued
+        write counts as found; that write is then skipped.
         Returns True if deleted, False if not found.
         """
         collections_to_check = [
             self._collection_name(user_id),
             SHARED_COLLECTION,
         ]
+        with self._pending_lock:
+            if self._pending.get(memory_id) in collections_to_check:
+                self._pending[memory_id] = None
+                return True
         for col_name in collections_to_check:
+            known = self._known_ids.get(col_name)
+            if not known or memory_id not in known:
+                continue
             try:
-                col = self._get_collection(col_name)
-                existing = col.get(ids=[memory_id])
-                if existing["ids"]:
-                    col.delete(ids=[memory_id])
-                    return True
+                self._get_collection(col_name).delete(ids=[memory_id])
             except Exception:
                 continue
+            known.discard(memory_id)
+            self._invalidate_query_cache(col_name)
+            return True
         return False
 
     def is_healthy(self) -> bool:
@@ -228,8 +450,11 @@ class ChromaMemory:
     # ------------------------------------------------------------------
 
     @staticmethod
-    def _format_results(query_result: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Convert raw ChromaDB query results to a flat list of dicts."""
+    def _format_results(query_result: Dict[str, Any], space: str = HNSW_SPACE) -> List[Dict[str, Any]]:
+        """
+        Convert raw ChromaDB query results to a flat list of dicts.
+        `space` is the collection's HNSW space, used to map distance → score.
+        """
         formatted = []
         ids = query_result.get("ids", [[]])[0]
         documents = query_result.get("documents", [[]])[0]
@@ -237,10 +462,14 @@ class ChromaMemory:
         distances = query_result.get("distances", [[]])[0]
 
         for i, doc_id in enumerate(ids):
-            # ChromaDB distance is L2 or cosine distance; convert to similarity score
+            # Convert ChromaDB distance to cosine similarity (unit-norm embeddings):
+            #   ip: distance = 1 - cos      l2: distance = |a-b|² = 2 - 2·cos
             distance = distances[i] if i < len(distances) else 1.0
-            # For normalized cosine embeddings: similarity = 1 - distance/2
-            score = max(0.0, 1.0 - distance / 2.0)
+            if space == "ip":
+                score = 1.0 - distance
+            else:
+                score = 1.0 - distance / 2.0
+            score = min(1.0, max(0.0, score))
             meta = metadatas[i] if i < len(metadatas) else {}
             formatted.append({
                 "id": doc_id,
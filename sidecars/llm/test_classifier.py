@@ -79,6 +79,17 @@ class TestConversationalKeywords:
         result = classify("mom", "hello, how are you?")
         assert result.model_key == "fast"
 
+    def test_keyword_requires_word_boundary(self):
+        """'quoi' inside 'pourquoi' must not count as a conversational keyword."""
+        result = classify("dad", "pourquoi le ciel est bleu")
+        assert result.model_key == "full"
+        assert "pourquoi" in result.reason
+
+    def test_first_listed_keyword_wins(self):
+        """Overlapping matches report the keyword listed first ('quoi' before "c'est quoi")."""
+        result = classify("dad", "c'est quoi ça")
+        assert "'quoi'" in result.reason
+
 
 class TestComplexityKeywords:
     """Complexity keywords trigger full model for non-forced profiles."""
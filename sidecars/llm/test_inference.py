@@ -10,7 +10,6 @@ from __future__ import annotations
 import sys
 import os
 import asyncio
-import tempfile
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
@@ -18,9 +17,7 @@ import pytest
 import pytest_asyncio
 import httpx
 
-from config import load_config
 from inference import InferenceEngine
-from memory import ChromaMemory
 
 
 # ---------------------------------------------------------------------------
@@ -47,18 +44,7 @@ skip_if_no_ollama = pytest.mark.skipif(
 # Fixtures
 # ---------------------------------------------------------------------------
 
-@pytest.fixture(scope="module")
-def tmp_config():
-    with tempfile.TemporaryDirectory() as tmpdir:
-        cfg = load_config()
-        cfg.chromadb.path = tmpdir
-        yield cfg
-
-
-@pytest.fixture(scope="module")
-def mem(tmp_config):
-    return ChromaMemory(tmp_config)
-
+# `tmp_config` and `mem` are session-scoped, see conftest.py.
 
 @pytest_asyncio.fixture(scope="module")
 async def eng(tmp_config, mem):
@@ -164,3 +150,10 @@ async def test_chat_returns_model_name_string(eng):
         eng._config.ollama.models.fast,
         eng._config.ollama.models.full,
     )
+
+
+@pytest.mark.asyncio
+async def test_warmup_runs_without_ollama(tmp_config, mem):
+    """warmup() exercises classifier + memory only — no Ollama call."""
+    engine = InferenceEngine(config=tmp_config, memory=mem)
+    await engine.warmup()
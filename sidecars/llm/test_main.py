@@ -0,0 +1,60 @@
+"""
+Tests for the FastAPI layer (request validation before background writes).
+No Ollama needed; the memory store is the session-scoped conftest fixture.
+
+Run with:  LLM_SIDECAR_MOCK_EMBEDDINGS=1 pytest test_main.py -v
+"""
+from __future__ import annotations
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+
+
+@pytest.fixture
+def client(mem, monkeypatch):
+    # No `with` block: the lifespan (Ollama engine) is not started
+    monkeypatch.setattr(main, "memory_store", mem)
+    return TestClient(main.app)
+
+
+class TestMemoryAdd:
+
+    def test_valid_metadata_is_queued_and_stored(self, client, mem):
+        resp = client.post("/memory/add", json={
+            "user_id": "dad",
+            "content": "Dad's bike has a flat tyre",
+            "metadata": {"tag": "bike", "priority": 2, "weight": 0.5, "approved": True},
+        })
+        assert resp.status_code == 202
+        assert resp.json()["status"] == "queued"
+        # TestClient runs background tasks before returning
+        assert mem.delete("dad", resp.json()["id"]) is True
+
+    @pytest.mark.parametrize("metadata", [
+        {"nested": {"a": 1}},
+        {"x": None},
+        {"tags": ["a", "b"]},
+        {"": "no key"},
+        {"chroma:document": "reserved"},
+        {"#document": "reserved"},
+    ])
+    def test_invalid_metadata_rejected_not_queued(self, client, mem, monkeypatch, metadata):
+        def _fail(**kwargs):
+            raise AssertionError("invalid payload must not be queued")
+
+        monkeypatch.setattr(main, "_write_memory", _fail)
+        resp = client.post("/memory/add", json={
+            "user_id": "dad", "content": "anything", "metadata": metadata,
+        })
+        assert resp.status_code == 422
+
+    def test_delete_while_write_queued(self, client, mem, monkeypatch):
+        queued = []
+        monkeypatch.setattr(main, "_write_memory", lambda **kwargs: queued.append(kwargs))
+        entry_id = client.post("/memory/add", json={"user_id": "dad", "content": "short-lived"}).json()["id"]
+        resp = client.request("DELETE", f"/memory/dad/{entry_id}", json={"caller_id": "mom"})
+        assert resp.status_code == 200
+        mem.add(**queued[0])  # the background write runs after the delete
+        assert mem.delete("dad", entry_id) is False
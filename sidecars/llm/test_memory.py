@@ -9,34 +9,38 @@ from __future__ import annotations
 import sys
 import os
 import time
-import tempfile
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
+import numpy as np
 import pytest
 from unittest.mock import patch, MagicMock
-from config import load_config, AppConfig
 
 
 # ---------------------------------------------------------------------------
 # Fixtures
 # ---------------------------------------------------------------------------
 
-@pytest.fixture(scope="module")
-def tmp_config() -> AppConfig:
-    """Config pointing to a temporary directory for ChromaDB."""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        cfg = load_config()
-        # Override chromadb path to temp dir
-        cfg.chromadb.path = tmpdir
-        yield cfg
+# `tmp_config` and `mem` are session-scoped, see conftest.py.
 
+DAD_PYTHON = "Dad prefers code examples in Python"
+MOM_CONCISE = "Mom likes concise explanations"
+TEEN_GAMING = "Teen enjoys gaming"
+DAD_SECRET = "dad_secret_unique_memory_xyzzy_42"
+MOM_SECRET = "mom_private_note_abc123"
+DAD_EXCLUSIVE = "dad_exclusive_memory_789xyz"
 
-@pytest.fixture(scope="module")
-def mem(tmp_config):
-    """Fresh ChromaMemory instance backed by temp storage."""
-    from memory import ChromaMemory
-    return ChromaMemory(tmp_config)
+
+@pytest.fixture(scope="session")
+def seeded_mem(mem):
+    """`mem` with a fixed corpus embedded once, for search-only tests."""
+    mem.add("dad", DAD_PYTHON, source="approved_learning")
+    mem.add("mom", MOM_CONCISE, source="conversation")
+    mem.add("teen", TEEN_GAMING, source="conversation")
+    mem.add("dad", DAD_SECRET, source="conversation")
+    mem.add("mom", MOM_SECRET, source="approved_learning")
+    mem.add("dad", DAD_EXCLUSIVE, source="conversation")
+    return mem
 
 
 # ---------------------------------------------------------------------------
@@ -51,24 +55,52 @@ class TestMemoryAddAndSearch:
         assert isinstance(entry_id, str)
         assert len(entry_id) > 0
 
-    def test_search_finds_added_memory(self, mem):
+    def test_add_keeps_preassigned_id(self, mem):
+        """add() should store the entry under an ID handed out beforehand."""
+        entry_id = mem.new_entry_id()
+        returned = mem.add("dad", "Dad queued this memory", entry_id=entry_id)
+        assert returned == entry_id
+        assert mem.delete("dad", entry_id) is True
+
+    def test_delete_before_queued_write_lands(self, mem):
+        """Deleting a reserved ID before its write runs should drop the write."""
+        entry_id = mem.reserve_entry_id("dad")
+        assert mem.delete("mom", entry_id) is False  # other user's entry
+        assert mem.delete("dad", entry_id) is True
+        mem.add("dad", "Dad changed his mind about this", entry_id=entry_id)
+        assert entry_id not in mem._known_ids["memory_dad"]
+        assert mem.delete("dad", entry_id) is False
+
+    def test_entry_ids_are_time_ordered(self, mem):
+        """Generated IDs should be version-7 UUIDs that sort by creation time."""
+        import uuid
+        first = mem.new_entry_id()
+        time.sleep(0.002)
+        second = mem.new_entry_id()
+        assert uuid.UUID(first).version == 7
+        assert first < second
+
+    def test_search_finds_added_memory(self, seeded_mem):
         """A recently added memory should appear in search results."""
-        mem.add("dad", "Dad prefers code examples in Python", source="approved_learning")
-        results = mem.search("dad", "Python code examples", top_k=5)
+        results = seeded_mem.search("dad", "Python code examples", top_k=5)
         contents = [r["content"] for r in results]
         assert any("Python" in c for c in contents)
 
-    def test_search_returns_score(self, mem):
+    def test_search_returns_score(self, seeded_mem):
         """Search results should have a score between 0 and 1."""
-        mem.add("mom", "Mom likes concise explanations", source="conversation")
-        results = mem.search("mom", "concise", top_k=3)
+        results = seeded_mem.search("mom", "concise", top_k=3)
         for r in results:
             assert 0.0 <= r["score"] <= 1.0
 
-    def test_search_includes_metadata(self, mem):
+    def test_exact_match_scores_one(self, seeded_mem):
+        """Querying with a stored text should score ~1.0 (inner product on unit vectors)."""
+        results = seeded_mem.search("teen", TEEN_GAMING, top_k=1)
+        assert results[0]["content"] == TEEN_GAMING
+        assert results[0]["score"] == pytest.approx(1.0, abs=1e-3)
+
+    def test_search_includes_metadata(self, seeded_mem):
         """Search results should include source and timestamp fields."""
-        mem.add("teen", "Teen enjoys gaming", source="conversation")
-        results = mem.search("teen", "gaming", top_k=3)
+        results = seeded_mem.search("teen", "gaming", top_k=3)
         assert len(results) > 0
         first = results[0]
         assert "source" in first
@@ -82,32 +114,26 @@ class TestMemoryAddAndSearch:
 
 class TestCollectionIsolation:
 
-    def test_dad_memory_not_visible_to_teen(self, mem):
+    def test_dad_memory_not_visible_to_teen(self, seeded_mem):
         """A memory added for dad should NOT appear in teen's search results."""
-        secret = "dad_secret_unique_memory_xyzzy_42"
-        mem.add("dad", secret, source="conversation")
-
-        teen_results = mem.search("teen", secret, top_k=5)
+        secret = DAD_SECRET
+        teen_results = seeded_mem.search("teen", secret, top_k=5)
         teen_contents = [r["content"] for r in teen_results]
         assert not any(secret in c for c in teen_contents), (
             "dad's private memory leaked into teen's results"
         )
 
-    def test_mom_memory_not_visible_to_child(self, mem):
+    def test_mom_memory_not_visible_to_child(self, seeded_mem):
         """A memory added for mom should NOT appear in child's results."""
-        secret = "mom_private_note_abc123"
-        mem.add("mom", secret, source="approved_learning")
-
-        child_results = mem.search("child", secret, top_k=5)
+        secret = MOM_SECRET
+        child_results = seeded_mem.search("child", secret, top_k=5)
         child_contents = [r["content"] for r in child_results]
         assert not any(secret in c for c in child_contents)
 
-    def test_dad_memory_visible_to_dad_only(self, mem):
+    def test_dad_memory_visible_to_dad_only(self, seeded_mem):
         """A memory added for dad should appear in dad's results."""
-        unique = "dad_exclusive_memory_789xyz"
-        mem.add("dad", unique, source="conversation")
-
-        dad_results = mem.search("dad", unique, top_k=5)
+        unique = DAD_EXCLUSIVE
+        dad_results = seeded_mem.search("dad", unique, top_k=5)
         dad_contents = [r["content"] for r in dad_results]
         assert any(unique in c for c in dad_contents)
 
@@ -131,6 +157,89 @@ class TestSharedCollection:
             )
 
 
+# ---------------------------------------------------------------------------
+# Test: distance space
+# ---------------------------------------------------------------------------
+
+class TestDistanceSpace:
+
+    def test_legacy_l2_collection_scores_as_cosine(self, tmp_config, tmp_path):
+        """Collections created before the ip switch keep l2 and still score correctly."""
+        import chromadb
+        from chromadb.config import Settings as ChromaSettings
+        from memory import ChromaMemory
+
+        cfg = tmp_config.model_copy(deep=True)
+        cfg.chromadb.path = str(tmp_path)
+        legacy = chromadb.PersistentClient(
+            path=cfg.chromadb.path, settings=ChromaSettings(anonymized_telemetry=False)
+        )
+        legacy.get_or_create_collection("memory_dad")
+
+        store = ChromaMemory(cfg)
+        assert store._spaces["memory_dad"] == "l2"
+        store.add("dad", "legacy_collection_entry")
+        results = store.search("dad", "legacy_collection_entry", top_k=1)
+        assert results[0]["score"] == pytest.approx(1.0, abs=1e-3)
+
+
+# ---------------------------------------------------------------------------
+# Test: query cache
+# ---------------------------------------------------------------------------
+
+class TestQueryCache:
+
+    def test_repeat_query_served_from_cache(self, mem, monkeypatch):
+        """A repeated query must not touch ChromaDB again."""
+        first = mem.search("dad", "query cache probe", top_k=3)
+
+        def _fail(name):
+            raise AssertionError("search should have been served from the cache")
+
+        monkeypatch.setattr(mem, "_get_collection", _fail)
+        assert mem.search("dad", "query cache probe", top_k=3) == first
+        assert mem.search("dad", "query cache probe", top_k=1) == first[:1]
+
+    def test_add_invalidates_user_cache(self, mem):
+        mem.search("mom", "Mom grows tomatoes on the balcony")
+        mem_id = mem.add("mom", "Mom grows tomatoes on the balcony")
+        results = mem.search("mom", "Mom grows tomatoes on the balcony")
+        assert results[0]["id"] == mem_id
+
+    def test_shared_add_invalidates_all_caches(self, mem):
+        content = "The family car is due for a service in May"
+        mem.search("teen", content)
+        mem_id = mem.add("shared", content)
+        assert any(r["id"] == mem_id for r in mem.search("teen", content))
+
+    def test_disabled_cache_stores_nothing(self):
+        from memory import QueryCache
+        cache = QueryCache(capacity=0)
+        vec = np.ones(4, dtype=np.float32) / 2.0
+        cache.put(vec, 5, [{"id": "x"}], cache.generation)
+        assert cache.get(vec, 5) is None
+
+    def test_write_during_search_is_not_cached_stale(self, mem, monkeypatch):
+        """An add landing between the ChromaDB query and cache.put must win."""
+        query = "Dad drinks his coffee black every morning"
+        mem.add("dad", query)
+        real_get_collection = mem._get_collection
+        state = {"writing": False, "done": False}
+
+        def interleave(name):
+            # After the dad collection was queried, let a concurrent add land
+            if name == "memory_shared" and not state["done"] and not state["writing"]:
+                state["writing"] = True
+                state["new_id"] = mem.add("dad", query + " with tea on Sundays")
+                state["writing"], state["done"] = False, True
+            return real_get_collection(name)
+
+        monkeypatch.setattr(mem, "_get_collection", interleave)
+        first = mem.search("dad", query, top_k=5)
+        assert state["new_id"] not in [r["id"] for r in first]
+        assert state["new_id"] in [r["id"] for r in mem.search("dad", query, top_k=5)]
+
+
 # ---------------------------------------------------------------------------
 # Test: delete
 # ---------------------------------------------------------------------------
@@ -150,6 +259,14 @@ class TestMemoryDelete:
         contents = [r["content"] for r in results]
         assert not any(unique in c for c in contents)
 
+    def test_delete_entry_from_previous_session(self, mem, tmp_config):
+        """Entries already on disk should be deletable by a fresh instance."""
+        from memory import ChromaMemory
+        entry_id = mem.add("mom", "entry_persisted_before_restart", source="conversation")
+
+        reopened = ChromaMemory(tmp_config)
+        assert reopened.delete("mom", entry_id) is True
+
     def test_delete_nonexistent_returns_false(self, mem):
         """Deleting an unknown ID should return False without raising."""
         result = mem.delete("dad", "non-existent-id-00000")
@@ -2,37 +2,76 @@
 Security access logger for Voice Sidecar.
 Logs all identification attempts to JSONL format.
 """
-import json
+import atexit
+import queue
+import threading
+import time
 from pathlib import Path
-from datetime import datetime
 from typing import Optional
 import logging
 
+import orjson
+
 logger = logging.getLogger(__name__)
 
+# Queue sentinel telling the writer thread to finish and close the file
+_STOP = object()
+
+# How often flush()/close() re-check that the writer thread is still alive
+_WRITER_POLL_SECONDS = 0.5
+
 
 class AccessLogger:
     """
     Logs speaker identification attempts to JSONL file.
     Each line is a complete JSON object.
+
+    log_identification() only enqueues the entry; a single daemon thread
+    serializes and writes it. The writer drains up to `batch_size` entries
+    or waits at most `flush_interval_seconds`, then issues one write+flush
+    per batch. Remaining entries are written on flush/close/interpreter exit.
     """
-    
-    def __init__(self, log_path: str):
+
+    def __init__(
+        self,
+        log_path: str,
+        batch_size: int = 64,
+        flush_interval_seconds: float = 0.05
+    ):
         """
-        Initialize access logger.
-        
+        Initialize access logger and start its writer thread.
+
         Args:
             log_path: Path to JSONL log file
+            batch_size: Maximum entries written per batch
+            flush_interval_seconds: Maximum time an entry waits in the queue
         """
         self.log_path = Path(log_path)
-        
+        self.batch_size = batch_size
+        self.flush_interval_seconds = flush_interval_seconds
+
         # Create parent directories if they don't exist
         self.log_path.parent.mkdir(parents=True, exist_ok=True)
-        
-        # Create log file if it doesn't exist
-        if not self.log_path.exists():
-            self.log_path.touch()
-    
+
+        # Persistent binary append handle (creates the file if missing);
+        # only the writer thread touches it after this point
+        self._fh = open(self.log_path, 'ab', buffering=1 << 16)
+        self._queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._closed = False
+        self._close_lock = threading.Lock()
+
+        # Cached "YYYY-MM-DDTHH:MM:SS" prefix for the current second
+        # (writer thread only)
+        self._ts_second = -1
+        self._ts_prefix = ""
+
+        self._writer = threading.Thread(
+            target=self._drain, name="access-log-writer", daemon=True
+        )
+        self._writer.start()
+
+        atexit.register(self.close)
+
     def log_identification(
         self,
         event: str,
@@ -43,7 +82,7 @@ class AccessLogger:
     ):
         """
         Log an identification event.
-        
+
         Args:
             event: Event type - "identified", "fallback", "rejected", or "no_speech"
             user_id: Identified user ID or None
@@ -51,17 +90,108 @@ class AccessLogger:
             audio_duration_seconds: Duration of audio file
             fallback_reason: Reason for fallback (e.g., "ambiguous_candidates: [dad, mom]")
         """
+        if self._closed:
+            logger.error("Failed to write access log: logger is closed")
+            return
+        # Capture the event time now; formatting happens on the writer thread
+        self._queue.put_nowait((
+            time.time(), event, user_id, confidence,
+            audio_duration_seconds, fallback_reason
+        ))
+
+    def flush(self):
+        """Block until every entry logged so far has been written to disk."""
+        if self._closed:
+            return
+        done = threading.Event()
+        self._queue.put_nowait(done)
+        # Stop waiting if the writer died; nobody would ever set the event
+        while not done.wait(_WRITER_POLL_SECONDS):
+            if not self._writer.is_alive():
+                logger.error("Access log writer thread is not running; flush abandoned")
+                return
+
+    def close(self):
+        """Write pending entries, stop the writer and close the file. Safe to call more than once."""
+        with self._close_lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._queue.put_nowait(_STOP)
+        self._writer.join()
+        if not self._fh.closed:
+            # Writer exited without reaching _STOP
+            self._fh.close()
+
+    def _drain(self):
+        """Writer thread: batch queued entries into single writes."""
+        while True:
+            item = self._queue.get()
+            batch = []
+            waiters = []
+            stop = False
+            deadline = time.monotonic() + self.flush_interval_seconds
+
+            while True:
+                if item is _STOP:
+                    stop = True
+                    break
+                if isinstance(item, threading.Event):
+                    # flush() request: write what we have right away
+                    waiters.append(item)
+                    break
+                try:
+                    batch.append(self._serialize(item))
+                except Exception as e:
+                    # One bad entry must not kill the writer thread
+                    logger.error(f"Dropping unserializable access log entry {item!r}: {e}")
+                if len(batch) >= self.batch_size:
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+
+            if batch:
+                try:
+                    self._fh.write(b"".join(batch))
+                    self._fh.flush()
+                except Exception as e:
+                    logger.error(f"Failed to write access log: {e}")
+
+            for waiter in waiters:
+                waiter.set()
+
+            if stop:
+                self._fh.close()
+                return
+
+    def _serialize(self, item: tuple) -> bytes:
+        """Encode one queued entry as a JSONL line."""
+        ts, event, user_id, confidence, audio_duration_seconds, fallback_reason = item
         log_entry = {
-            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "timestamp": self._utc_timestamp(ts),
             "event": event,
             "user_id": user_id,
             "confidence": confidence,
             "fallback_reason": fallback_reason,
             "audio_duration_seconds": round(audio_duration_seconds, 2)
         }
-        
-        try:
-            with open(self.log_path, 'a') as f:
-                f.write(json.dumps(log_entry) + '\n')
-        except Exception as e:
-            logger.error(f"Failed to write access log: {e}")
+        return orjson.dumps(
+            log_entry,
+            option=orjson.OPT_APPEND_NEWLINE | orjson.OPT_SERIALIZE_NUMPY
+        )
+
+    def _utc_timestamp(self, now: float) -> str:
+        """
+        ISO-8601 UTC timestamp with microseconds and a 'Z' suffix.
+        The date/time prefix is formatted once per second.
+        """
+        second = int(now)
+        if second != self._ts_second:
+            self._ts_second = second
+            self._ts_prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(second))
+        return f"{self._ts_prefix}.{int((now - second) * 1_000_000):06d}Z"
@@ -7,6 +7,12 @@ from typing import Optional, List
 import yaml
 from pydantic import BaseModel, Field
 
+# libyaml-backed loader when PyYAML was built with it (much faster parse)
+try:
+    from yaml import CSafeLoader as _SafeLoader
+except ImportError:  # pragma: no cover - pure-Python PyYAML build
+    from yaml import SafeLoader as _SafeLoader
+
 
 class ServerConfig(BaseModel):
     """Server configuration."""
@@ -19,6 +25,7 @@ class VADConfig(BaseModel):
     threshold: float = 0.5
     min_speech_duration_ms: int = 250
     min_silence_duration_ms: int = 100
+    onnx_model_path: Optional[str] = "../../data/voice/models/silero_vad.onnx"  # missing → torch.hub
 
 
 class SpeakerIDConfig(BaseModel):
@@ -27,13 +34,14 @@ class SpeakerIDConfig(BaseModel):
     confidence_low: float = 0.60
     embeddings_path: str = "../../data/voice/embeddings"
     fallback_hierarchy: List[str] = Field(default_factory=lambda: ["child", "teen", "mom", "dad"])
+    quantize_embeddings: bool = True  # int8 scoring via SimSIMD; false = float32
 
 
 class TranscriptionConfig(BaseModel):
     """Transcription configuration."""
     model: str = "base"  # base | small | medium
     device: str = "cuda"
-    compute_type: str = "float16"
+    compute_type: str = "int8_float16"
     language: Optional[str] = None  # null = auto-detect
 
 
@@ -71,13 +79,23 @@ def load_config(config_path: str = "config.yaml") -> Config:
         raise FileNotFoundError(f"Configuration file not found: {config_path}")
     
     with open(config_file, 'r') as f:
-        config_dict = yaml.safe_load(f)
+        config_dict = yaml.load(f, Loader=_SafeLoader)
     
     return Config(**config_dict)
 
 
 # Global config instance - loaded once at startup
+DEFAULT_CONFIG_PATH = "config.yaml"
 _config: Optional[Config] = None
+_config_mtime_ns: Optional[int] = None
+
+
+def _mtime_ns(config_path: str) -> Optional[int]:
+    """Return the file's mtime in ns, or None if it doesn't exist."""
+    try:
+        return Path(config_path).stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
 
 
 def get_config() -> Config:
@@ -88,19 +106,26 @@ def get_config() -> Config:
     Returns:
         Global Config object
     """
-    global _config
+    global _config, _config_mtime_ns
     if _config is None:
-        _config = load_config()
+        _config_mtime_ns = _mtime_ns(DEFAULT_CONFIG_PATH)
+        _config = load_config(DEFAULT_CONFIG_PATH)
     return _config
 
 
 def reload_config() -> Config:
     """
-    Force reload configuration from disk.
+    Reload configuration from disk.
+    No-op (returns the cached instance) when config.yaml's mtime is
+    unchanged since the last load.
     
     Returns:
-        Newly loaded Config object
+        Current Config object
     """
-    global _config
-    _config = load_config()
+    global _config, _config_mtime_ns
+    mtime_ns = _mtime_ns(DEFAULT_CONFIG_PATH)
+    if _config is not None and mtime_ns is not None and mtime_ns == _config_mtime_ns:
+        return _config
+    _config = load_config(DEFAULT_CONFIG_PATH)
+    _config_mtime_ns = mtime_ns
     return _config
@@ -6,9 +6,10 @@ from fastapi import FastAPI, File, UploadFile, HTTPException
 from fastapi.responses import JSONResponse
 import numpy as np
 import soundfile as sf
-import io
+import asyncio
 import logging
 from contextlib import asynccontextmanager
+from typing import Tuple
 
 from config import get_config
 from pipeline import VoicePipeline
@@ -57,6 +58,36 @@ app = FastAPI(
 )
 
 
+def _load_audio(fileobj) -> Tuple[np.ndarray, int]:
+    """
+    Decode a WAV file object to mono float32.
+    Reads straight from the upload's spooled temp file (no in-memory
+    copy); libsndfile converts samples to float32 itself.
+    """
+    with sf.SoundFile(fileobj) as snd:
+        sample_rate = snd.samplerate
+        audio_data = snd.read(dtype='float32')
+    
+    # Convert to mono if stereo
+    if len(audio_data.shape) > 1:
+        audio_data = _downmix_to_mono(audio_data)
+    
+    return audio_data, sample_rate
+
+
+def _downmix_to_mono(audio: np.ndarray) -> np.ndarray:
+    """
+    Average channels of a (frames, channels) float32 array into mono.
+    The common stereo case is a single fused add into the output buffer
+    followed by an in-place scale — no intermediate temporaries.
+    """
+    if audio.shape[1] == 2:
+        mono = np.add(audio[:, 0], audio[:, 1])
+        mono *= 0.5
+        return mono
+    return audio.mean(axis=1, dtype=np.float32)
+
+
 @app.get("/health")
 async def health():
     """
@@ -106,21 +137,12 @@ async def process_voice(file: UploadFile = File(...)):
         )
     
     try:
-        # Read uploaded file
-        audio_bytes = await file.read()
-        
-        # Load audio using soundfile
-        audio_data, sample_rate = sf.read(io.BytesIO(audio_bytes))
-        
-        # Convert to mono if stereo
-        if len(audio_data.shape) > 1:
-            audio_data = np.mean(audio_data, axis=1)
-        
-        # Ensure float32 format
-        audio_data = audio_data.astype(np.float32)
+        # Decode and run the pipeline on worker threads so long
+        # transcriptions don't block the event loop (/health etc.)
+        audio_data, sample_rate = await asyncio.to_thread(_load_audio, file.file)
         
         # Process through pipeline
-        result = pipeline.process(audio_data, sample_rate)
+        result = await asyncio.to_thread(pipeline.process, audio_data, sample_rate)
         
         return JSONResponse(content=result)
         
@@ -146,7 +168,9 @@ async def reload_embeddings():
         )
     
     try:
-        result = pipeline.reload_embeddings()
+        # Takes the speaker-ID lock; run off the event loop so an in-flight
+        # identify() can't stall other requests (/health included)
+        result = await asyncio.to_thread(pipeline.reload_embeddings)
         
         if result.get("status") == "error":
             raise HTTPException(
@@ -189,9 +213,13 @@ if __name__ == "__main__":
     config = get_config()
     port = config.server.port
     
+    # uvloop + httptools (shipped with uvicorn[standard]) for faster
+    # event loop and multipart upload parsing
     uvicorn.run(
         "main:app",
         host="0.0.0.0",
         port=port,
+        loop="uvloop",
+        http="httptools",
         log_level="info"
     )
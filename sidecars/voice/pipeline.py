@@ -3,18 +3,40 @@ Voice processing pipeline orchestrator.
 Coordinates VAD → Speaker ID → Transcription workflow.
 """
 import numpy as np
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
+import hashlib
 import logging
+import threading
+from collections import OrderedDict
 from pathlib import Path
 
 from vad import SileroVAD
 from speaker_id import SpeakerIdentifier
 from transcription import Transcriber
 from access_logger import AccessLogger
+from resample import resample
 from config import Config
 
 logger = logging.getLogger(__name__)
 
+# Every stage (Silero VAD, Resemblyzer, Whisper) works at 16 kHz
+TARGET_SAMPLE_RATE = 16000
+
+# Exact-match result cache (identical audio bytes + sample rate)
+RESULT_CACHE_SIZE = 256
+
+# Common scaffold for every /voice/process result; copy() and override
+_EMPTY_RESULT: Dict[str, Any] = {
+    "status": None,
+    "user_id": None,
+    "confidence": None,
+    "transcript": None,
+    "language": None,
+    "audio_duration_seconds": 0.0,
+    "fallback": False,
+    "fallback_reason": None
+}
+
 
 class VoicePipeline:
     """
@@ -41,7 +63,8 @@ class VoicePipeline:
             self.vad = SileroVAD(
                 threshold=config.vad.threshold,
                 min_speech_duration_ms=config.vad.min_speech_duration_ms,
-                min_silence_duration_ms=config.vad.min_silence_duration_ms
+                min_silence_duration_ms=config.vad.min_silence_duration_ms,
+                onnx_model_path=config.vad.onnx_model_path
             )
             self.vad_status = "ok"
         except Exception as e:
@@ -55,7 +78,8 @@ class VoicePipeline:
                 embeddings_path=config.speaker_id.embeddings_path,
                 confidence_high=config.speaker_id.confidence_high,
                 confidence_low=config.speaker_id.confidence_low,
-                fallback_hierarchy=config.speaker_id.fallback_hierarchy
+                fallback_hierarchy=config.speaker_id.fallback_hierarchy,
+                quantize_embeddings=config.speaker_id.quantize_embeddings
             )
             self.speaker_id_status, self.loaded_users = self.speaker_id.get_status()
         except Exception as e:
@@ -72,6 +96,7 @@ class VoicePipeline:
                 compute_type=config.transcription.compute_type,
                 language=config.transcription.language
             )
+            self.transcriber.warmup()
             self.transcription_status = "ok"
         except Exception as e:
             logger.error(f"Transcription initialization failed: {e}")
@@ -81,6 +106,19 @@ class VoicePipeline:
         # Access logger
         self.access_logger = AccessLogger(config.logging.access_log_path)
         
+        # One lock per model: concurrent requests overlap across stages,
+        # but no model is entered by two threads at once (Silero VAD keeps
+        # recurrent state; GPU Whisper calls are serialized)
+        self._vad_lock = threading.Lock()
+        self._speaker_id_lock = threading.Lock()
+        self._transcription_lock = threading.Lock()
+        
+        # LRU of results for byte-identical audio (client retries, replays).
+        # Exact match only: an approximate fingerprint could hand one user's
+        # identity or transcript to a similar-sounding request.
+        self._result_cache: "OrderedDict[Tuple[int, bytes], Dict[str, Any]]" = OrderedDict()
+        self._result_cache_lock = threading.Lock()
+        
         logger.info("Voice pipeline initialization complete")
     
     def process(
@@ -108,28 +146,82 @@ class VoicePipeline:
                 "fallback_reason": str | None
             }
         """
+        # Every stage receives the same float32 C-contiguous array, so
+        # none of them has to cast or copy it (VAD wraps it zero-copy).
+        # A no-op for decoded uploads, which are already float32.
+        return self._process(
+            np.ascontiguousarray(audio_data, dtype=np.float32),
+            sample_rate
+        )
+    
+    def _process(
+        self,
+        audio_data: np.ndarray,
+        sample_rate: int
+    ) -> Dict[str, Any]:
+        """
+        Serve byte-identical audio from the result cache, otherwise run
+        the pipeline stages. Cache hits are still written to the access log.
+        """
+        key = (sample_rate, hashlib.blake2b(audio_data, digest_size=16).digest())
+        
+        with self._result_cache_lock:
+            cached = self._result_cache.get(key)
+            if cached is not None:
+                self._result_cache.move_to_end(key)
+        
+        if cached is not None:
+            self.access_logger.log_identification(
+                event=cached["status"],
+                user_id=cached["user_id"],
+                confidence=cached["confidence"],
+                audio_duration_seconds=cached["audio_duration_seconds"],
+                fallback_reason=cached["fallback_reason"]
+            )
+            return dict(cached)
+        
+        result, cacheable = self._run_stages(audio_data, sample_rate)
+        
+        if cacheable:
+            with self._result_cache_lock:
+                self._result_cache[key] = dict(result)
+                if len(self._result_cache) > RESULT_CACHE_SIZE:
+                    self._result_cache.popitem(last=False)
+        
+        return result
+    
+    def _run_stages(
+        self,
+        audio_data: np.ndarray,
+        sample_rate: int
+    ) -> Tuple[Dict[str, Any], bool]:
+        """
+        Run VAD → Speaker ID → Transcription on mono float32 audio.
+        
+        Returns:
+            (result, cacheable): cacheable is False when a stage was
+            unavailable or failed, so a retry of the same audio reruns it
+        """
         # Calculate audio duration
         audio_duration = len(audio_data) / sample_rate
         
+        # Resample once here; the stages then skip their own resampling
+        audio_data = resample(audio_data, sample_rate, TARGET_SAMPLE_RATE)
+        sample_rate = TARGET_SAMPLE_RATE
+        
         # Step 1: Voice Activity Detection
         if self.vad is None:
             logger.warning("VAD not available, skipping VAD check")
             has_speech = True
         else:
-            has_speech, speech_prob = self.vad.detect_speech(audio_data, sample_rate)
+            with self._vad_lock:
+                has_speech, speech_prob = self.vad.detect_speech(audio_data, sample_rate)
             
             if not has_speech:
                 logger.info(f"No speech detected (prob: {speech_prob:.2f})")
-                result = {
-                    "status": "no_speech",
-                    "user_id": None,
-                    "confidence": None,
-                    "transcript": None,
-                    "language": None,
-                    "audio_duration_seconds": round(audio_duration, 2),
-                    "fallback": False,
-                    "fallback_reason": None
-                }
+                result = _EMPTY_RESULT.copy()
+                result["status"] = "no_speech"
+                result["audio_duration_seconds"] = audio_duration
                 
                 # Log to access log
                 self.access_logger.log_identification(
@@ -139,31 +231,34 @@ class VoicePipeline:
                     audio_duration_seconds=audio_duration
                 )
                 
-                return result
+                return result, True
         
         # Step 2: Speaker Identification
         if self.speaker_id is None:
             logger.error("Speaker ID not available, cannot process audio")
-            return self._error_result(audio_duration, "Speaker identification unavailable")
+            return self._error_result(audio_duration, "Speaker identification unavailable"), False
         
-        user_id, confidence, is_fallback, fallback_reason = self.speaker_id.identify(
-            audio_data,
-            sample_rate
-        )
+        # Failures still answer as before (rejected / empty transcript) but
+        # leave the result uncached
+        stages_ok = True
+        with self._speaker_id_lock:
+            try:
+                user_id, confidence, is_fallback, fallback_reason = self.speaker_id.identify(
+                    audio_data,
+                    sample_rate,
+                    raise_errors=True
+                )
+            except Exception:
+                user_id, confidence, is_fallback, fallback_reason = None, 0.0, False, None
+                stages_ok = False
         
         # Check if speaker was rejected (confidence < 0.60)
         if user_id is None:
             logger.info(f"Speaker rejected (confidence: {confidence:.2f})")
-            result = {
-                "status": "rejected",
-                "user_id": None,
-                "confidence": round(confidence, 2),
-                "transcript": None,
-                "language": None,
-                "audio_duration_seconds": round(audio_duration, 2),
-                "fallback": False,
-                "fallback_reason": None
-            }
+            result = _EMPTY_RESULT.copy()
+            result["status"] = "rejected"
+            result["confidence"] = confidence
+            result["audio_duration_seconds"] = audio_duration
             
             # Log to access log
             self.access_logger.log_identification(
@@ -173,15 +268,26 @@ class VoicePipeline:
                 audio_duration_seconds=audio_duration
             )
             
-            return result
+            return result, stages_ok
         
         # Step 3: Transcription (only if speaker identified with confidence >= 0.60)
         if self.transcriber is None:
             logger.error("Transcriber not available, cannot transcribe")
             transcript = ""
             language = "unknown"
+            stages_ok = False
         else:
-            transcript, language = self.transcriber.transcribe(audio_data, sample_rate)
+            with self._transcription_lock:
+                try:
+                    transcript, language = self.transcriber.transcribe(
+                        audio_data,
+                        sample_rate,
+                        raise_errors=True
+                    )
+                except Exception:
+                    transcript = ""
+                    language = "unknown"
+                    stages_ok = False
         
         # Determine status
         if is_fallback:
@@ -196,16 +302,17 @@ class VoicePipeline:
             f"transcript: '{transcript[:50]}...'"
         )
         
-        result = {
-            "status": status,
-            "user_id": user_id,
-            "confidence": round(confidence, 2),
-            "transcript": transcript,
-            "language": language,
-            "audio_duration_seconds": round(audio_duration, 2),
-            "fallback": is_fallback,
-            "fallback_reason": fallback_reason
-        }
+        result = _EMPTY_RESULT.copy()
+        result.update(
+            status=status,
+            user_id=user_id,
+            confidence=confidence,
+            transcript=transcript,
+            language=language,
+            audio_duration_seconds=audio_duration,
+            fallback=is_fallback,
+            fallback_reason=fallback_reason
+        )
         
         # Log to access log
         self.access_logger.log_identification(
@@ -216,7 +323,7 @@ class VoicePipeline:
             fallback_reason=fallback_reason
         )
         
-        return result
+        return result, stages_ok
     
     def _error_result(self, audio_duration: float, error_msg: str) -> Dict[str, Any]:
         """
@@ -229,17 +336,11 @@ class VoicePipeline:
         Returns:
             Error result dict
         """
-        return {
-            "status": "error",
-            "user_id": None,
-            "confidence": None,
-            "transcript": None,
-            "language": None,
-            "audio_duration_seconds": round(audio_duration, 2),
-            "fallback": False,
-            "fallback_reason": None,
-            "error": error_msg
-        }
+        result = _EMPTY_RESULT.copy()
+        result["status"] = "error"
+        result["audio_duration_seconds"] = audio_duration
+        result["error"] = error_msg
+        return result
     
     def reload_embeddings(self) -> Dict[str, Any]:
         """
@@ -254,10 +355,15 @@ class VoicePipeline:
                 "error": "Speaker identification not initialized"
             }
         
-        result = self.speaker_id.reload_embeddings()
+        with self._speaker_id_lock:
+            result = self.speaker_id.reload_embeddings()
+            
+            # Update cached status
+            self.speaker_id_status, self.loaded_users = self.speaker_id.get_status()
         
-        # Update cached status
-        self.speaker_id_status, self.loaded_users = self.speaker_id.get_status()
+        # Cached identities may no longer match the new embeddings
+        with self._result_cache_lock:
+            self._result_cache.clear()
         
         return {
             "status": "reloaded",
@@ -0,0 +1,56 @@
+"""
+Shared audio resampling for Voice Sidecar.
+One torchaudio Resample module (precomputed sinc kernel) per rate pair,
+reused by the pipeline, VAD and transcription.
+"""
+import threading
+from typing import Dict, Tuple
+
+import numpy as np
+import torch
+import torchaudio
+
+_resamplers: Dict[Tuple[int, int], torchaudio.transforms.Resample] = {}
+_resamplers_lock = threading.Lock()
+
+
+def get_resampler(orig_sr: int, target_sr: int) -> torchaudio.transforms.Resample:
+    """
+    Get the cached Resample module for a rate pair, creating it on first use.
+    
+    Args:
+        orig_sr: Original sample rate
+        target_sr: Target sample rate
+        
+    Returns:
+        torchaudio Resample module
+    """
+    key = (orig_sr, target_sr)
+    with _resamplers_lock:
+        resampler = _resamplers.get(key)
+        if resampler is None:
+            resampler = torchaudio.transforms.Resample(orig_sr, target_sr)
+            _resamplers[key] = resampler
+    return resampler
+
+
+def resample(audio: np.ndarray, orig_sr: int, target_sr: int) -> np.ndarray:
+    """
+    Resample mono float32 audio.
+    
+    Args:
+        audio: Audio numpy array (mono, float32)
+        orig_sr: Original sample rate
+        target_sr: Target sample rate
+        
+    Returns:
+        Resampled float32 audio (the input itself if the rates match)
+    """
+    if orig_sr == target_sr:
+        return audio
+    
+    with torch.inference_mode():
+        resampled = get_resampler(orig_sr, target_sr)(
+            torch.from_numpy(np.ascontiguousarray(audio, dtype=np.float32))
+        )
+    return resampled.numpy()
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""Whisper conversion script - pre-converts a Hugging Face checkpoint to CTranslate2.
+
+Build-time only: needs `pip install transformers` on top of requirements.txt.
+Point `transcription.model` in config.yaml at the output directory; faster-whisper
+then loads the already-quantized weights instead of converting/quantizing at startup.
+"""
+import argparse, sys, logging
+from pathlib import Path
+from ctranslate2.converters import TransformersConverter
+
+logging.basicConfig(level=logging.INFO, format='%(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Files faster-whisper reads next to model.bin (tokenizer + mel feature settings)
+_COPY_FILES = ["tokenizer.json", "preprocessor_config.json"]
+
+def convert_whisper(model: str, output_dir: str, quantization: str = "int8_float16", force: bool = False):
+    logger.info(f"Converting {model} → {output_dir} ({quantization})")
+    converter = TransformersConverter(model, copy_files=_COPY_FILES, load_as_float16=True)
+    out = converter.convert(output_dir, quantization=quantization, force=force)
+    logger.info(f"✓ CTranslate2 model written to {Path(out).resolve()}")
+    logger.info(f"  Set transcription.model: \"{out}\" in config.yaml")
+    return out
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Convert a Whisper checkpoint for faster-whisper")
+    parser.add_argument('--model', default='openai/whisper-base')
+    parser.add_argument('--output-dir', default='../../data/voice/models/whisper-base-ct2')
+    parser.add_argument('--quantization', default='int8_float16',
+                        choices=['int8_float16', 'int8', 'float16', 'float32'])
+    parser.add_argument('--force', action='store_true', help="Overwrite an existing output directory")
+    args = parser.parse_args()
+    try: convert_whisper(args.model, args.output_dir, args.quantization, args.force)
+    except Exception as e:
+        logger.error(f"Conversion failed: {e}")
+        sys.exit(1)
@@ -1,33 +1,48 @@
 #!/usr/bin/env python3
 """User enrollment script - generates speaker embeddings from audio samples."""
-import argparse, numpy as np, sys, logging
+import argparse, numpy as np, sys, logging, torch
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 from resemblyzer import VoiceEncoder, preprocess_wav
 import soundfile as sf
 
 logging.basicConfig(level=logging.INFO, format='%(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-def enroll_user(user_id: str, sample_files: list, embeddings_dir: str):
+_ENCODER = None
+
+def _get_encoder() -> VoiceEncoder:
+    """Load the VoiceEncoder once per process (picks CUDA when available)."""
+    global _ENCODER
+    if _ENCODER is None: _ENCODER = VoiceEncoder()
+    return _ENCODER
+
+def _load_sample(sample_path: Path) -> np.ndarray:
+    """Read a WAV sample, downmix to mono and run Resemblyzer preprocessing."""
+    audio, sr = sf.read(str(sample_path))
+    if len(audio.shape) > 1: audio = np.mean(audio, axis=1)
+    return preprocess_wav(audio, source_sr=sr)
+
+def enroll_user(user_id: str, sample_files: list, embeddings_dir: str, max_workers: int = 4):
     logger.info(f"Enrolling user: {user_id}")
-    encoder = VoiceEncoder()
+    encoder = _get_encoder()
+    sample_paths = [Path(f) for f in sample_files]
+    for sample_path in sample_paths:
+        if not sample_path.exists(): 
+            logger.error(f"File not found: {sample_path}"); sys.exit(1)
     embeddings = []
     
-    for i, sample_file in enumerate(sample_files, 1):
-        sample_path = Path(sample_file)
-        if not sample_path.exists(): 
-            logger.error(f"File not found: {sample_file}"); sys.exit(1)
-        logger.info(f"Processing sample {i}/{len(sample_files)}: {sample_path.name}")
-        audio, sr = sf.read(str(sample_path))
-        if len(audio.shape) > 1: audio = np.mean(audio, axis=1)
-        preprocessed = preprocess_wav(audio, source_sr=sr)
-        embeddings.append(encoder.embed_utterance(preprocessed))
+    # Decode + preprocess on worker threads while the encoder embeds earlier samples
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for i, (sample_path, preprocessed) in enumerate(zip(sample_paths, pool.map(_load_sample, sample_paths)), 1):
+            logger.info(f"Embedding sample {i}/{len(sample_paths)}: {sample_path.name}")
+            with torch.inference_mode(): embeddings.append(encoder.embed_utterance(preprocessed))
     
     avg_embedding = np.mean(embeddings, axis=0)
     embeddings_path = Path(embeddings_dir)
     embeddings_path.mkdir(parents=True, exist_ok=True)
     output_file = embeddings_path / f"{user_id}.npy"
-    np.save(output_file, avg_embedding)
+    np.save(output_file, avg_embedding.astype(np.float16))  # half-size on disk; loader upcasts
     logger.info(f"✓ Embedding saved to: {output_file}")
     logger.info(f"✓ User '{user_id}' enrolled ({len(embeddings)} samples, norm: {np.linalg.norm(avg_embedding):.4f})")
 
@@ -2,14 +2,44 @@
 Speaker identification using Resemblyzer.
 Compares voice embeddings to identify known users.
 """
+import hashlib
+import math
+import threading
 import numpy as np
+from collections import OrderedDict
 from pathlib import Path
 from typing import Dict, Optional, Tuple, List
 import logging
+import torch
 from resemblyzer import VoiceEncoder, preprocess_wav
 
+# SIMD cosine kernels (AVX2/AVX-512/NEON) when available, NumPy otherwise
+try:
+    import simsimd
+except ImportError:  # pragma: no cover - optional dependency
+    simsimd = None
+
 logger = logging.getLogger(__name__)
 
+# Query embeddings kept per (audio bytes, sample rate); LRU-evicted
+EMBED_CACHE_SIZE = 128
+
+
+def _quantize_int8(vectors: np.ndarray) -> np.ndarray:
+    """
+    Symmetric int8 quantization with one scale per vector (last axis).
+    Cosine similarity is scale-invariant, so the scales are not kept.
+    
+    Args:
+        vectors: float32 array of shape (..., 256)
+        
+    Returns:
+        int8 array of the same shape
+    """
+    scale = np.abs(vectors).max(axis=-1, keepdims=True) / 127.0
+    scale[scale == 0] = 1.0
+    return np.clip(np.round(vectors / scale), -127, 127).astype(np.int8)
+
 
 class SpeakerIdentifier:
     """
@@ -22,7 +52,8 @@ class SpeakerIdentifier:
         embeddings_path: str,
         confidence_high: float = 0.75,
         confidence_low: float = 0.60,
-        fallback_hierarchy: List[str] = None
+        fallback_hierarchy: List[str] = None,
+        quantize_embeddings: bool = True
     ):
         """
         Initialize speaker identifier.
@@ -32,18 +63,40 @@ class SpeakerIdentifier:
             confidence_high: Threshold for normal identification (≥ 0.75)
             confidence_low: Threshold for fallback mode (≥ 0.60)
             fallback_hierarchy: Order of restriction (most to least restrictive)
+            quantize_embeddings: Score with int8 embeddings through SimSIMD's
+                i8 cosine kernel (float32 is used when SimSIMD is missing)
         """
         self.embeddings_path = Path(embeddings_path)
         self.confidence_high = confidence_high
         self.confidence_low = confidence_low
         self.fallback_hierarchy = fallback_hierarchy or ["child", "teen", "mom", "dad"]
+        # user → position in the hierarchy (0 = most restrictive)
+        self._hierarchy_rank = {u: i for i, u in enumerate(self.fallback_hierarchy)}
+        self.quantize_embeddings = quantize_embeddings
         
-        # User embeddings storage
+        # User embeddings storage: float32 unit vectors (normalized at load)
         self.user_embeddings: Dict[str, np.ndarray] = {}
         
+        # Per-file (st_mtime_ns, normalized embedding) so reloads only
+        # re-read files that changed on disk
+        self._file_cache: Dict[str, Tuple[int, np.ndarray]] = {}
+        
+        # Stacked copy of user_embeddings (row i ↔ _user_ids[i]) so
+        # identify() scores every user with a single matrix-vector product
+        self._user_ids: List[str] = []
+        self._emb_matrix: np.ndarray = np.empty((0, 256), dtype=np.float32)
+        # int8 copy of _emb_matrix, used when quantize_embeddings is on
+        self._emb_matrix_i8: np.ndarray = np.empty((0, 256), dtype=np.int8)
+        
+        # Query audio → embedding cache; independent of the enrolled set,
+        # so reload_embeddings() leaves it intact
+        self._embed_cache: "OrderedDict[Tuple[int, bytes], np.ndarray]" = OrderedDict()
+        self._embed_cache_lock = threading.Lock()
+        
         # Initialize voice encoder
         try:
             self.encoder = VoiceEncoder()
+            self.encoder.eval()
             logger.info("Resemblyzer VoiceEncoder loaded successfully")
         except Exception as e:
             logger.error(f"Failed to load VoiceEncoder: {e}")
@@ -51,6 +104,19 @@ class SpeakerIdentifier:
         
         # Load embeddings
         self.load_embeddings()
+        
+        self.warmup()
+    
+    def warmup(self):
+        """
+        Run one throwaway forward pass on 1 s of silence so kernel selection
+        (cuDNN autotune on CUDA) happens at startup, not on the first request.
+        """
+        try:
+            with torch.inference_mode():
+                self.encoder.embed_utterance(np.zeros(16000, dtype=np.float32))
+        except Exception as e:
+            logger.warning(f"VoiceEncoder warmup failed: {e}")
     
     def load_embeddings(self) -> Dict[str, List[str]]:
         """
@@ -70,35 +136,76 @@ class SpeakerIdentifier:
         
         for user in expected_users:
             embedding_file = self.embeddings_path / f"{user}.npy"
+            cache_key = str(embedding_file)
             
             if embedding_file.exists():
                 try:
-                    embedding = np.load(embedding_file)
+                    mtime_ns = embedding_file.stat().st_mtime_ns
+                    cached = self._file_cache.get(cache_key)
+                    if cached is not None and cached[0] == mtime_ns:
+                        self.user_embeddings[user] = cached[1]
+                        loaded.append(user)
+                        logger.debug(f"Embedding for user {user} unchanged on disk")
+                        continue
+                    
+                    # Map the file instead of reading it into a fresh buffer
+                    mapped = np.load(embedding_file, mmap_mode='r')
                     
                     # Validate embedding shape
-                    if embedding.shape != (256,):
+                    if mapped.shape != (256,):
                         logger.warning(
-                            f"Invalid embedding shape for {user}: {embedding.shape}, expected (256,)"
+                            f"Invalid embedding shape for {user}: {mapped.shape}, expected (256,)"
                         )
+                        self._file_cache.pop(cache_key, None)
                         missing.append(user)
                         continue
                     
+                    # Files may be float16 (enroll_user.py), float32 or
+                    # float64; scoring always runs on float32 C-contiguous
+                    # unit vectors. np.array always copies (never a view of
+                    # the read-only mapping), so the mapping is released below
+                    embedding = np.array(mapped, dtype=np.float32)
+                    del mapped
+                    norm = np.linalg.norm(embedding)
+                    if norm > 0:
+                        embedding /= norm
                     self.user_embeddings[user] = embedding
+                    self._file_cache[cache_key] = (mtime_ns, embedding)
                     loaded.append(user)
                     logger.info(f"Loaded embedding for user: {user}")
                     
                 except Exception as e:
                     logger.warning(f"Failed to load embedding for {user}: {e}")
+                    self._file_cache.pop(cache_key, None)
                     missing.append(user)
             else:
                 logger.warning(f"Embedding file not found for user: {user}")
+                self._file_cache.pop(cache_key, None)
                 missing.append(user)
         
         if not loaded:
             logger.warning("No user embeddings loaded - speaker identification will be degraded")
         
+        self._build_embedding_matrix()
+        
         return {"loaded": loaded, "missing": missing}
     
+    def _build_embedding_matrix(self):
+        """
+        Stack user_embeddings into an (N, 256) float32 matrix with unit-norm rows.
+        Zero vectors stay zero (they score 0.0 against any query).
+        """
+        self._user_ids = list(self.user_embeddings.keys())
+        if not self._user_ids:
+            self._emb_matrix = np.empty((0, 256), dtype=np.float32)
+            self._emb_matrix_i8 = np.empty((0, 256), dtype=np.int8)
+            return
+        
+        # user_embeddings entries are already unit vectors (normalized at load)
+        matrix = np.stack([self.user_embeddings[u] for u in self._user_ids]).astype(np.float32)
+        self._emb_matrix = matrix
+        self._emb_matrix_i8 = _quantize_int8(matrix)
+    
     def reload_embeddings(self) -> Dict[str, List[str]]:
         """
         Reload embeddings from disk without restarting.
@@ -113,7 +220,8 @@ class SpeakerIdentifier:
     def identify(
         self,
         audio_data: np.ndarray,
-        sample_rate: int
+        sample_rate: int,
+        raise_errors: bool = False
     ) -> Tuple[Optional[str], float, bool, Optional[str]]:
         """
         Identify speaker from audio.
@@ -121,6 +229,8 @@ class SpeakerIdentifier:
         Args:
             audio_data: Audio numpy array (mono, float32)
             sample_rate: Sample rate in Hz
+            raise_errors: Re-raise embedding/scoring failures instead of
+                reporting them as a rejection
             
         Returns:
             Tuple of (user_id, confidence, is_fallback, fallback_reason)
@@ -134,55 +244,138 @@ class SpeakerIdentifier:
             return None, 0.0, False, None
         
         try:
-            # Preprocess audio for Resemblyzer (expects 16kHz)
-            preprocessed = preprocess_wav(audio_data, source_sr=sample_rate)
+            embedding = self._embed(audio_data, sample_rate)
             
-            # Generate embedding
-            embedding = self.encoder.embed_utterance(preprocessed)
-            
-            # Compute similarities with all known users
-            similarities = {}
-            for user, user_embedding in self.user_embeddings.items():
-                similarity = self._cosine_similarity(embedding, user_embedding)
-                similarities[user] = similarity
+            # Cosine similarity with all known users, clamped to [0, 1]
+            sims = self._score_all(embedding)
             
             # Find best match
-            best_user = max(similarities, key=similarities.get)
-            best_score = similarities[best_user]
+            best_idx = int(np.argmax(sims))
+            best_user = self._user_ids[best_idx]
+            best_score = float(sims[best_idx])
             
             # Apply decision logic
-            return self._apply_decision_logic(similarities, best_user, best_score)
+            return self._apply_decision_logic(sims, self._user_ids, best_user, best_score)
             
         except Exception as e:
             logger.error(f"Speaker identification failed: {e}")
+            if raise_errors:
+                raise
             return None, 0.0, False, None
     
-    def _cosine_similarity(self, embedding1: np.ndarray, embedding2: np.ndarray) -> float:
+    def _embed(self, audio_data: np.ndarray, sample_rate: int) -> np.ndarray:
+        """
+        Compute (or fetch from cache) the Resemblyzer embedding of an utterance.
+        
+        Args:
+            audio_data: Audio numpy array (mono, float32)
+            sample_rate: Sample rate in Hz
+            
+        Returns:
+            Read-only float32 C-contiguous embedding of shape (256,), the
+            same dtype/layout as _emb_matrix rows so no product casts
+        """
+        audio = np.ascontiguousarray(audio_data)
+        key = (sample_rate, hashlib.blake2b(audio, digest_size=16).digest())
+        with self._embed_cache_lock:
+            cached = self._embed_cache.get(key)
+            if cached is not None:
+                self._embed_cache.move_to_end(key)
+                return cached
+        
+        preprocessed = preprocess_wav(audio_data, source_sr=sample_rate)
+        
+        # Generate embedding (no autograd tape / version counters)
+        with torch.inference_mode():
+            embedding = self.encoder.embed_utterance(preprocessed)
+        
+        # Resemblyzer already returns float32; only other dtypes are copied
+        embedding = np.ascontiguousarray(embedding, dtype=np.float32)
+        embedding.setflags(write=False)
+        with self._embed_cache_lock:
+            self._embed_cache[key] = embedding
+            if len(self._embed_cache) > EMBED_CACHE_SIZE:
+                self._embed_cache.popitem(last=False)
+        return embedding
+    
+    def clear_embed_cache(self):
+        """Drop all cached query embeddings (e.g. after swapping the encoder)."""
+        with self._embed_cache_lock:
+            self._embed_cache.clear()
+    
+    def _score_all(self, query: np.ndarray) -> np.ndarray:
+        """
+        Cosine similarity of one query embedding against every enrolled user.
+        
+        Args:
+            query: Query embedding (float32, shape (256,))
+            
+        Returns:
+            float32 array of scores in [0, 1], aligned with _user_ids
+        """
+        if not np.any(query):
+            return np.zeros(len(self._user_ids), dtype=np.float32)
+        
+        if simsimd is not None:
+            # cdist returns cosine distances for the (1, N) pair grid
+            if self.quantize_embeddings:
+                distances = np.asarray(simsimd.cdist(
+                    _quantize_int8(query)[None, :], self._emb_matrix_i8, metric="cosine"
+                ))[0]
+            else:
+                distances = np.asarray(
+                    simsimd.cdist(query[None, :], self._emb_matrix, metric="cosine")
+                )[0]
+            sims = (1.0 - distances).astype(np.float32)
+        else:
+            # Matrix rows are unit vectors: one product scores every user
+            sims = self._emb_matrix @ (query / np.linalg.norm(query))
+        
+        np.clip(sims, 0.0, 1.0, out=sims)
+        return sims
+    
+    def _cosine_similarity(
+        self,
+        embedding1: np.ndarray,
+        embedding2: np.ndarray
+    ) -> float:
         """
         Compute cosine similarity between two embeddings.
         
         Args:
-            embedding1: First embedding vector
-            embedding2: Second embedding vector
+            embedding1: First embedding vector (e.g. the query)
+            embedding2: Second embedding vector (e.g. an enrolled user)
             
         Returns:
             Cosine similarity score (0.0 - 1.0)
         """
-        dot_product = np.dot(embedding1, embedding2)
-        norm1 = np.linalg.norm(embedding1)
-        norm2 = np.linalg.norm(embedding2)
+        if simsimd is not None:
+            # simsimd treats two zero vectors as identical; keep the 0.0 contract
+            if not (np.any(embedding1) and np.any(embedding2)):
+                return 0.0
+            distance = simsimd.cosine(
+                np.asarray(embedding1, dtype=np.float32),
+                np.asarray(embedding2, dtype=np.float32)
+            )
+            return float(max(0.0, min(1.0, 1.0 - distance)))
+        
+        dot_product = float(np.dot(embedding1, embedding2))
+        norm1_sq = float(np.vdot(embedding1, embedding1))
+        norm2_sq = float(np.vdot(embedding2, embedding2))
         
-        if norm1 == 0 or norm2 == 0:
+        if norm1_sq == 0 or norm2_sq == 0:
             return 0.0
         
-        similarity = dot_product / (norm1 * norm2)
+        # One sqrt of the product instead of two linalg.norm calls
+        similarity = dot_product / math.sqrt(norm1_sq * norm2_sq)
         
         # Clamp to [0, 1] range
         return float(max(0.0, min(1.0, similarity)))
     
     def _apply_decision_logic(
         self,
-        similarities: Dict[str, float],
+        sims: np.ndarray,
+        user_ids: List[str],
         best_user: str,
         best_score: float
     ) -> Tuple[Optional[str], float, bool, Optional[str]]:
@@ -190,7 +383,8 @@ class SpeakerIdentifier:
         Apply 3-tier confidence decision logic.
         
         Args:
-            similarities: Dict of user -> similarity scores
+            sims: Similarity scores, aligned with user_ids
+            user_ids: User IDs for each entry of sims
             best_user: User with highest similarity
             best_score: Highest similarity score
             
@@ -207,17 +401,15 @@ class SpeakerIdentifier:
         
         # Tier 2: Medium confidence (0.60-0.74) - fallback to most restrictive profile
         # Find all candidates with score >= 0.60 (candidates proches)
-        candidates = [
-            user for user, score in similarities.items()
-            if score >= self.confidence_low
-        ]
+        candidate_idx = np.flatnonzero(np.asarray(sims) >= self.confidence_low)
         
-        if len(candidates) == 1:
+        if len(candidate_idx) == 1:
             # Single candidate in fallback range - use that candidate
-            fallback_user = candidates[0]
+            fallback_user = user_ids[int(candidate_idx[0])]
             fallback_reason = f"single_candidate: {fallback_user}"
         else:
             # Multiple candidates - use most restrictive AMONG these candidates
+            candidates = [user_ids[i] for i in candidate_idx]
             fallback_user = self._get_most_restrictive(candidates)
             fallback_reason = f"ambiguous_candidates: {sorted(candidates)}"
         
@@ -233,14 +425,12 @@ class SpeakerIdentifier:
         Returns:
             Most restrictive user ID from candidates
         """
-        # Fallback hierarchy is ordered from most to least restrictive
-        # Return the first one that appears in candidates
-        for user in self.fallback_hierarchy:
-            if user in candidates:
-                return user
-        
-        # Fallback: return first candidate if none match hierarchy
-        return candidates[0]
+        # Fallback hierarchy is ordered from most to least restrictive:
+        # lowest rank wins. Users outside the hierarchy rank last, and min()
+        # keeps the first of equal ranks, so if none match we return the
+        # first candidate
+        unranked = len(self._hierarchy_rank)
+        return min(candidates, key=lambda u: self._hierarchy_rank.get(u, unranked))
     
     def get_status(self) -> Tuple[str, List[str]]:
         """
@@ -0,0 +1,78 @@
+"""Unit tests for the JSONL access logger."""
+import json
+import time
+from datetime import datetime
+import numpy as np
+import access_logger
+from access_logger import AccessLogger
+
+def _read(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+class TestAccessLogger:
+    def test_entries_written_on_flush(self, tmp_path):
+        path = tmp_path / "logs" / "access_log.jsonl"
+        log = AccessLogger(str(path), batch_size=100, flush_interval_seconds=3600)
+        log.log_identification("identified", "dad", 0.87, 1.234)
+        log.log_identification("rejected", None, 0.41, 2.0)
+        log.flush()
+        entries = _read(path)
+        assert [e["event"] for e in entries] == ["identified", "rejected"]
+        assert entries[0]["user_id"] == "dad" and entries[0]["audio_duration_seconds"] == 1.23
+        log.close()
+
+    def test_flushes_after_batch_size(self, tmp_path):
+        path = tmp_path / "access_log.jsonl"
+        log = AccessLogger(str(path), batch_size=2, flush_interval_seconds=3600)
+        log.log_identification("no_speech", None, None, 0.5)
+        log.log_identification("no_speech", None, None, 0.5)
+        deadline = time.monotonic() + 2.0
+        while len(_read(path)) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert len(_read(path)) == 2
+        log.close()
+
+    def test_log_returns_before_write(self, tmp_path):
+        path = tmp_path / "access_log.jsonl"
+        log = AccessLogger(str(path), batch_size=100, flush_interval_seconds=3600)
+        log.log_identification("identified", "dad", 0.9, 1.0)
+        assert _read(path) == []
+        log.close()
+        assert len(_read(path)) == 1
+
+    def test_close_flushes_and_is_idempotent(self, tmp_path):
+        path = tmp_path / "access_log.jsonl"
+        log = AccessLogger(str(path), batch_size=100, flush_interval_seconds=3600)
+        log.log_identification("fallback", "child", 0.67, 1.0, "single_candidate: child")
+        log.close()
+        log.close()
+        assert _read(path)[0]["fallback_reason"] == "single_candidate: child"
+
+    def test_timestamp_is_iso_utc(self, tmp_path):
+        path = tmp_path / "access_log.jsonl"
+        log = AccessLogger(str(path))
+        log.log_identification("identified", "mom", 0.9, 1.0)
+        log.close()
+        ts = _read(path)[0]["timestamp"]
+        assert ts.endswith("Z")
+        datetime.fromisoformat(ts[:-1])
+
+    def test_bad_entry_skipped_and_numpy_serialized(self, tmp_path):
+        path = tmp_path / "access_log.jsonl"
+        log = AccessLogger(str(path), batch_size=100, flush_interval_seconds=3600)
+        log.log_identification("identified", "dad", np.float32(0.75), 1.0)
+        log.log_identification("identified", "dad", object(), 1.0)
+        log.log_identification("rejected", None, 0.3, 1.0)
+        log.flush()
+        entries = _read(path)
+        assert [e["event"] for e in entries] == ["identified", "rejected"]
+        assert entries[0]["confidence"] == 0.75 and log._writer.is_alive()
+        log.close()
+
+    def test_flush_and_close_return_when_writer_dead(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(access_logger, "_WRITER_POLL_SECONDS", 0.01)
+        log = AccessLogger(str(tmp_path / "access_log.jsonl"))
+        log._queue.put_nowait(access_logger._STOP); log._writer.join()
+        log.log_identification("identified", "dad", 0.9, 1.0)
+        log.flush()
+        log.close()
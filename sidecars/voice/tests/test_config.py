@@ -0,0 +1,28 @@
+"""Unit tests for config loading and mtime-based reload."""
+import os
+import shutil
+from pathlib import Path
+import pytest
+import config as config_module
+
+@pytest.fixture
+def config_dir(tmp_path, monkeypatch):
+    shutil.copy(Path(config_module.__file__).parent / "config.yaml", tmp_path / "config.yaml")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(config_module, "_config", None)
+    monkeypatch.setattr(config_module, "_config_mtime_ns", None)
+    return tmp_path
+
+class TestReloadConfig:
+    def test_unchanged_file_returns_cached_instance(self, config_dir):
+        first = config_module.get_config()
+        assert config_module.reload_config() is first
+
+    def test_modified_file_is_reparsed(self, config_dir):
+        first = config_module.get_config()
+        path = config_dir / "config.yaml"
+        path.write_text(path.read_text().replace("port: 10001", "port: 10101"))
+        st = path.stat()
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+        reloaded = config_module.reload_config()
+        assert reloaded is not first and reloaded.server.port == 10101
@@ -83,3 +83,91 @@ class TestPipelineStates:
         assert result["user_id"] == "child"
         assert result["fallback"] is True
         assert result["transcript"] == "Can I play?"  # Transcription happens in fallback mode
+
+class TestResampling:
+    def test_stages_receive_16khz_audio(self, pipeline):
+        pipeline._mock_vad.detect_speech.return_value = (True, 0.8)
+        pipeline._mock_sid.identify.return_value = ("dad", 0.87, False, None)
+        pipeline._mock_trans.transcribe.return_value = ("hi", "en")
+        result = pipeline.process(np.random.randn(8000).astype(np.float32) * 0.1, 8000)
+        for call in (pipeline._mock_vad.detect_speech, pipeline._mock_sid.identify, pipeline._mock_trans.transcribe):
+            audio, sr = call.call_args[0]
+            assert sr == 16000 and audio.dtype == np.float32 and len(audio) == 16000
+        assert result["audio_duration_seconds"] == pytest.approx(1.0)
+
+    def test_resampler_reused_per_rate(self, pipeline):
+        import resample
+        pipeline._mock_vad.detect_speech.return_value = (False, 0.1)
+        pipeline.process(np.random.randn(8000).astype(np.float32), 8000)
+        resampler = resample.get_resampler(8000, 16000)
+        pipeline.process(np.random.randn(8000).astype(np.float32), 8000)
+        assert resample.get_resampler(8000, 16000) is resampler
+
+class TestInputNormalization:
+    def test_float32_input_passed_without_copy(self, pipeline, mock_audio):
+        audio, sr = mock_audio
+        pipeline._mock_vad.detect_speech.return_value = (False, 0.0)
+        pipeline.process(audio, sr)
+        assert pipeline._mock_vad.detect_speech.call_args[0][0] is audio
+
+    def test_other_dtypes_normalized_once(self, pipeline):
+        audio = np.zeros(16000, dtype=np.float64)
+        pipeline._mock_vad.detect_speech.return_value = (True, 0.9)
+        pipeline._mock_sid.identify.return_value = (None, 0.3, False, None)
+        pipeline.process(audio, 16000)
+        vad_in = pipeline._mock_vad.detect_speech.call_args[0][0]
+        assert vad_in.dtype == np.float32 and vad_in.flags["C_CONTIGUOUS"]
+        assert pipeline._mock_sid.identify.call_args[0][0] is vad_in
+
+class TestResultCache:
+    def test_identical_audio_served_from_cache(self, pipeline, mock_audio):
+        audio, sr = mock_audio
+        pipeline._mock_vad.detect_speech.return_value = (True, 0.9)
+        pipeline._mock_sid.identify.return_value = ("dad", 0.87, False, None)
+        pipeline._mock_trans.transcribe.return_value = ("Lights on", "en")
+        first = pipeline.process(audio, sr)
+        second = pipeline.process(audio.copy(), sr)
+        assert second == first
+        assert pipeline._mock_sid.identify.call_count == 1
+        assert pipeline._mock_trans.transcribe.call_count == 1
+
+    def test_different_audio_misses_cache(self, pipeline, mock_audio):
+        audio, sr = mock_audio
+        pipeline._mock_vad.detect_speech.return_value = (False, 0.0)
+        pipeline.process(audio, sr)
+        pipeline.process(audio * 0.5, sr)
+        assert pipeline._mock_vad.detect_speech.call_count == 2
+
+    def test_cache_hit_is_logged(self, pipeline, mock_audio):
+        audio, sr = mock_audio
+        pipeline._mock_vad.detect_speech.return_value = (False, 0.0)
+        pipeline.access_logger = Mock()
+        pipeline.process(audio, sr)
+        pipeline.process(audio, sr)
+        assert pipeline.access_logger.log_identification.call_count == 2
+
+    def test_reload_embeddings_clears_cache(self, pipeline, mock_audio):
+        audio, sr = mock_audio
+        pipeline._mock_vad.detect_speech.return_value = (False, 0.0)
+        pipeline._mock_sid.reload_embeddings.return_value = {"loaded": ["dad"], "missing": []}
+        pipeline.process(audio, sr)
+        pipeline.reload_embeddings()
+        pipeline.process(audio, sr)
+        assert pipeline._mock_vad.detect_speech.call_count == 2
+
+    def test_stage_failures_not_cached(self, pipeline, mock_audio):
+        audio, sr = mock_audio
+        pipeline._mock_vad.detect_speech.return_value = (True, 0.9)
+        pipeline._mock_sid.identify.side_effect = RuntimeError("encoder OOM")
+        assert pipeline.process(audio, sr)["status"] == "rejected"
+        pipeline._mock_sid.identify.side_effect = None
+        pipeline._mock_sid.identify.return_value = ("dad", 0.87, False, None)
+        pipeline._mock_trans.transcribe.side_effect = RuntimeError("CUDA error")
+        result = pipeline.process(audio, sr)
+        assert result["status"] == "identified" and result["language"] == "unknown"
+        pipeline._mock_trans.transcribe.side_effect = None
+        pipeline._mock_trans.transcribe.return_value = ("Lights on", "en")
+        assert pipeline.process(audio, sr)["transcript"] == "Lights on"
+        assert pipeline.process(audio, sr)["transcript"] == "Lights on"  # now cached
+        assert pipeline._mock_sid.identify.call_count == 3
+        assert pipeline._mock_trans.transcribe.call_count == 2
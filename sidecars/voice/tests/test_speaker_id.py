@@ -19,45 +19,170 @@ def speaker_id(mock_embeddings):
         from speaker_id import SpeakerIdentifier
         return SpeakerIdentifier(mock_embeddings, 0.75, 0.60, ["child","teen","mom","dad"])
 
+def _decide(speaker_id, sims, best_user, best_score):
+    users = list(sims)
+    return speaker_id._apply_decision_logic(np.array([sims[u] for u in users], dtype=np.float32), users, best_user, best_score)
+
 class TestDecisionLogic:
     def test_high_confidence(self, speaker_id):
         sims = {"dad": 0.87, "mom": 0.45, "teen": 0.32, "child": 0.28}
-        user_id, conf, fallback, reason = speaker_id._apply_decision_logic(sims, "dad", 0.87)
+        user_id, conf, fallback, reason = _decide(speaker_id, sims, "dad", 0.87)
         assert user_id == "dad" and conf == 0.87 and not fallback and reason is None
 
     def test_low_confidence_rejection(self, speaker_id):
         sims = {"dad": 0.52, "mom": 0.48, "teen": 0.45, "child": 0.41}
-        user_id, conf, fallback, reason = speaker_id._apply_decision_logic(sims, "dad", 0.52)
+        user_id, conf, fallback, reason = _decide(speaker_id, sims, "dad", 0.52)
         assert user_id is None and conf == 0.52 and not fallback
 
     def test_single_candidate_fallback(self, speaker_id):
         sims = {"dad": 0.55, "mom": 0.67, "teen": 0.52, "child": 0.48}
-        user_id, conf, fallback, reason = speaker_id._apply_decision_logic(sims, "mom", 0.67)
+        user_id, conf, fallback, reason = _decide(speaker_id, sims, "mom", 0.67)
         assert user_id == "mom" and fallback and "single_candidate" in reason
 
     def test_multiple_candidates_most_restrictive(self, speaker_id):
         # dad=0.72, mom=0.63 both >= 0.60 → should return mom (most restrictive among candidates)
         sims = {"dad": 0.72, "mom": 0.63, "teen": 0.55, "child": 0.50}
-        user_id, conf, fallback, reason = speaker_id._apply_decision_logic(sims, "dad", 0.72)
+        user_id, conf, fallback, reason = _decide(speaker_id, sims, "dad", 0.72)
         assert user_id == "mom" and fallback and "ambiguous" in reason
 
     def test_fallback_with_all_candidates(self, speaker_id):
         # All >= 0.60 → should return child (most restrictive)
         sims = {"dad": 0.72, "mom": 0.68, "teen": 0.65, "child": 0.63}
-        user_id, conf, fallback, reason = speaker_id._apply_decision_logic(sims, "dad", 0.72)
+        user_id, conf, fallback, reason = _decide(speaker_id, sims, "dad", 0.72)
         assert user_id == "child" and fallback
 
     def test_boundary_075(self, speaker_id):
         sims = {"dad": 0.75, "mom": 0.40}
-        user_id, conf, fallback, reason = speaker_id._apply_decision_logic(sims, "dad", 0.75)
+        user_id, conf, fallback, reason = _decide(speaker_id, sims, "dad", 0.75)
         assert user_id == "dad" and not fallback  # Exactly 0.75 → normal
 
     def test_boundary_060(self, speaker_id):
         sims = {"dad": 0.60, "mom": 0.40}
-        user_id, conf, fallback, reason = speaker_id._apply_decision_logic(sims, "dad", 0.60)
+        user_id, conf, fallback, reason = _decide(speaker_id, sims, "dad", 0.60)
         assert user_id == "dad" and fallback  # Exactly 0.60 → fallback
 
     def test_below_060(self, speaker_id):
         sims = {"dad": 0.5999, "mom": 0.40}
-        user_id, conf, fallback, reason = speaker_id._apply_decision_logic(sims, "dad", 0.5999)
+        user_id, conf, fallback, reason = _decide(speaker_id, sims, "dad", 0.5999)
         assert user_id is None  # Below 0.60 → rejected
+
+class TestIdentify:
+    def _identify(self, speaker_id, embedding):
+        speaker_id.encoder.embed_utterance.return_value = embedding
+        with patch('speaker_id.preprocess_wav', side_effect=lambda audio, source_sr: audio):
+            return speaker_id.identify(np.zeros(16000, dtype=np.float32), 16000)
+
+    def test_identifies_enrolled_user(self, speaker_id, mock_embeddings):
+        dad = np.load(f"{mock_embeddings}/dad.npy")
+        user_id, conf, fallback, reason = self._identify(speaker_id, dad * 3.0)
+        assert user_id == "dad" and conf == pytest.approx(1.0, abs=1e-5) and not fallback
+
+    def test_matrix_rebuilt_on_reload(self, speaker_id, mock_embeddings):
+        np.save(f"{mock_embeddings}/mom.npy", -np.load(f"{mock_embeddings}/dad.npy"))
+        speaker_id.reload_embeddings()
+        mom = np.load(f"{mock_embeddings}/mom.npy")
+        user_id, conf, _, _ = self._identify(speaker_id, mom)
+        assert user_id == "mom" and conf == pytest.approx(1.0, abs=1e-5)
+
+    def test_reload_skips_unchanged_files(self, speaker_id, mock_embeddings):
+        before = dict(speaker_id.user_embeddings)
+        np.save(f"{mock_embeddings}/mom.npy", -np.load(f"{mock_embeddings}/dad.npy"))
+        with patch('speaker_id.np.load', wraps=np.load) as load:
+            speaker_id.reload_embeddings()
+        assert load.call_count == 1  # only mom.npy changed
+        assert speaker_id.user_embeddings["dad"] is before["dad"]
+        assert speaker_id.user_embeddings["mom"] is not before["mom"]
+
+    def test_float16_embeddings_loaded_as_float32(self, speaker_id, mock_embeddings):
+        dad = np.load(f"{mock_embeddings}/dad.npy")
+        np.save(f"{mock_embeddings}/dad.npy", dad.astype(np.float16))
+        speaker_id.reload_embeddings()
+        assert speaker_id.user_embeddings["dad"].dtype == np.float32
+        user_id, conf, _, _ = self._identify(speaker_id, dad)
+        assert user_id == "dad" and conf == pytest.approx(1.0, abs=1e-3)
+
+    def test_medium_score_goes_through_fallback(self, speaker_id, mock_embeddings):
+        dad = np.load(f"{mock_embeddings}/dad.npy"); dad = dad / np.linalg.norm(dad)
+        orth = np.random.default_rng(0).standard_normal(256); orth -= orth.dot(dad) * dad
+        query = 0.7 * dad + np.sqrt(1 - 0.49) * orth / np.linalg.norm(orth)
+        user_id, conf, fallback, reason = self._identify(speaker_id, query.astype(np.float32))
+        assert (user_id, fallback, reason) == ("dad", True, "single_candidate: dad")
+        assert conf == pytest.approx(0.7, abs=5e-3)  # int8 scoring
+
+    def test_repeated_audio_reuses_embedding(self, speaker_id, mock_embeddings):
+        dad = np.load(f"{mock_embeddings}/dad.npy")
+        speaker_id.encoder.embed_utterance.reset_mock()
+        first = self._identify(speaker_id, dad)
+        assert self._identify(speaker_id, -dad) == first  # served from cache
+        assert speaker_id.encoder.embed_utterance.call_count == 1
+        speaker_id.clear_embed_cache()
+        assert self._identify(speaker_id, -dad)[0] is None
+        assert speaker_id.encoder.embed_utterance.call_count == 2
+
+    def test_float64_inputs_scored_as_float32(self, speaker_id, mock_embeddings):
+        dad = np.load(f"{mock_embeddings}/dad.npy").astype(np.float64)
+        np.save(f"{mock_embeddings}/dad.npy", dad)
+        speaker_id.reload_embeddings()
+        assert speaker_id._emb_matrix.dtype == np.float32 and speaker_id._emb_matrix.flags.c_contiguous
+        speaker_id.encoder.embed_utterance.return_value = dad
+        with patch('speaker_id.preprocess_wav', side_effect=lambda audio, source_sr: audio):
+            embedding = speaker_id._embed(np.ones(16000, dtype=np.float32), 16000)
+        assert embedding.dtype == np.float32 and embedding.flags.c_contiguous and not embedding.flags.writeable
+
+    def test_zero_query_is_rejected(self, speaker_id):
+        user_id, conf, _, _ = self._identify(speaker_id, np.zeros(256, dtype=np.float32))
+        assert user_id is None and conf == 0.0
+
+class TestMostRestrictive:
+    def test_lowest_rank_wins(self, speaker_id):
+        assert speaker_id._get_most_restrictive(["dad", "teen", "mom"]) == "teen"
+
+    def test_unknown_users_rank_last(self, speaker_id):
+        assert speaker_id._get_most_restrictive(["guest", "dad"]) == "dad"
+        assert speaker_id._get_most_restrictive(["guest", "visitor"]) == "guest"
+
+class TestEncoderSetup:
+    def test_encoder_eval_and_warmed_up(self, speaker_id):
+        speaker_id.encoder.eval.assert_called_once()
+        (warmup_audio,), _ = speaker_id.encoder.embed_utterance.call_args
+        assert warmup_audio.shape == (16000,) and not warmup_audio.any()
+
+class TestCosineSimilarity:
+    def test_matches_reference_and_clamps(self, speaker_id):
+        a, b = np.random.randn(256).astype(np.float32), np.random.randn(256).astype(np.float32)
+        expected = float(np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b)))
+        assert speaker_id._cosine_similarity(a, b) == pytest.approx(max(0.0, expected), abs=1e-6)
+        assert speaker_id._cosine_similarity(a, -a) == 0.0 and speaker_id._cosine_similarity(a, 2 * a) == pytest.approx(1.0)
+
+    def test_zero_vector_scores_zero(self, speaker_id):
+        assert speaker_id._cosine_similarity(np.zeros(256), np.ones(256)) == 0.0
+
+    def test_enrolled_embeddings_stored_as_unit_vectors(self, speaker_id, mock_embeddings):
+        np.save(f"{mock_embeddings}/dad.npy", np.full(256, 3.0, dtype=np.float32))
+        speaker_id.reload_embeddings()
+        dad = speaker_id.user_embeddings["dad"]
+        assert np.linalg.norm(dad) == pytest.approx(1.0, abs=1e-6)
+
+class TestSimilarityBackends:
+    def test_numpy_fallback_matches_simsimd(self, speaker_id, monkeypatch):
+        import speaker_id as module
+        speaker_id.quantize_embeddings = False
+        query = np.random.randn(256).astype(np.float32)
+        fast = speaker_id._score_all(query)
+        monkeypatch.setattr(module, "simsimd", None)
+        assert np.allclose(speaker_id._score_all(query), fast, atol=1e-5)
+
+    def test_zero_vectors_score_zero_on_every_backend(self, speaker_id, monkeypatch):
+        import speaker_id as module
+        for backend in (module.simsimd, None):
+            monkeypatch.setattr(module, "simsimd", backend)
+            assert speaker_id._cosine_similarity(np.zeros(256), np.zeros(256)) == 0.0
+            assert not speaker_id._score_all(np.zeros(256, dtype=np.float32)).any()
+
+    def test_int8_scores_track_float32(self, speaker_id, mock_embeddings):
+        assert speaker_id._emb_matrix_i8.dtype == np.int8 and speaker_id._emb_matrix_i8.shape == (4, 256)
+        dad = np.load(f"{mock_embeddings}/dad.npy")
+        query = (dad + 0.5 * np.random.randn(256) / 16).astype(np.float32)
+        quantized = speaker_id._score_all(query)
+        speaker_id.quantize_embeddings = False
+        assert np.allclose(quantized, speaker_id._score_all(query), atol=1e-2)
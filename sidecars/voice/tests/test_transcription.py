@@ -0,0 +1,38 @@
+"""Unit tests for Whisper transcription wrapper."""
+import pytest, numpy as np
+from unittest.mock import Mock, patch
+
+@pytest.fixture
+def transcriber():
+    with patch('transcription.WhisperModel') as mock_model_cls:
+        model = Mock()
+        model.transcribe.return_value = ([Mock(text=" hello")], Mock(language="en"))
+        mock_model_cls.return_value = model
+        from transcription import Transcriber
+        t = Transcriber(model_size="base", device="cuda", compute_type="int8_float16")
+        t._model_cls = mock_model_cls
+        return t
+
+class TestTranscriber:
+    def test_compute_type_passed_to_model(self, transcriber):
+        assert transcriber._model_cls.call_args.kwargs["compute_type"] == "int8_float16"
+
+    def test_short_utterance_decoded_greedily(self, transcriber):
+        assert transcriber.transcribe(np.zeros(16000 * 2, dtype=np.float32), 16000) == ("hello", "en")
+        kwargs = transcriber.model.transcribe.call_args.kwargs
+        assert kwargs["beam_size"] == 1 and kwargs["best_of"] == 1 and kwargs["condition_on_previous_text"] is False
+        assert kwargs["without_timestamps"] is True and kwargs["word_timestamps"] is False
+
+    def test_segments_joined(self, transcriber):
+        segments = iter([Mock(text=" turn on"), Mock(text=" the lights ")])
+        transcriber.model.transcribe.return_value = (segments, Mock(language="fr"))
+        assert transcriber.transcribe(np.zeros(16000, dtype=np.float32), 16000) == ("turn on  the lights", "fr")
+
+    def test_long_utterance_uses_beam_search(self, transcriber):
+        transcriber.transcribe(np.zeros(16000 * 6, dtype=np.float32), 16000)
+        assert transcriber.model.transcribe.call_args.kwargs["beam_size"] == 5
+
+    def test_non_16khz_audio_resampled(self, transcriber):
+        transcriber.transcribe(np.zeros(8000, dtype=np.float32), 8000)
+        audio = transcriber.model.transcribe.call_args.args[0]
+        assert audio.dtype == np.float32 and len(audio) == 16000
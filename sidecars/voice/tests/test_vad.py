@@ -0,0 +1,68 @@
+"""Unit tests for Silero VAD (ONNX backend, with a fake session)."""
+import pytest, numpy as np
+from unittest.mock import Mock, patch
+
+def _vad(tmp_path, probs, **kwargs):
+    model = tmp_path / "silero_vad.onnx"; model.write_bytes(b"")
+    session = Mock(); inputs = []
+    def run(_, feeds):
+        inputs.append(feeds["input"].copy())
+        return np.array([[probs[len(inputs) - 1]]], dtype=np.float32), feeds["state"] + 1
+    session.run.side_effect = run
+    with patch('vad.onnxruntime') as ort:
+        ort.InferenceSession.return_value = session
+        from vad import SileroVAD
+        vad = SileroVAD(onnx_model_path=str(model), **kwargs)
+    vad._inputs = inputs
+    return vad
+
+class TestOnnxVAD:
+    def test_windows_carry_context(self, tmp_path):
+        vad = _vad(tmp_path, [0.0] * 3)
+        audio = np.arange(1100, dtype=np.float32)
+        assert vad.detect_speech(audio, 16000) == (False, 0.0)
+        first, second, third = vad._inputs
+        assert first.shape == (1, 576) and not first[0, :64].any()
+        assert np.array_equal(second[0, :64], audio[448:512]) and np.array_equal(second[0, 64:], audio[512:1024])
+        assert np.array_equal(third[0, 64:140], audio[1024:]) and not third[0, 140:].any()  # zero-padded
+
+    def test_sustained_speech_detected(self, tmp_path):
+        vad = _vad(tmp_path, [0.1] * 2 + [0.9] * 8, min_speech_duration_ms=250)
+        has_speech, prob = vad.detect_speech(np.zeros(5120, dtype=np.float32), 16000)
+        assert has_speech and prob == pytest.approx(0.8)
+
+    def test_short_blip_is_not_speech(self, tmp_path):
+        vad = _vad(tmp_path, [0.9, 0.9, 0.1, 0.1, 0.1, 0.1, 0.9, 0.1], min_speech_duration_ms=250, min_silence_duration_ms=100)
+        assert vad.detect_speech(np.zeros(4096, dtype=np.float32), 16000)[0] is False
+
+    def test_short_gaps_bridged(self, tmp_path):
+        vad = _vad(tmp_path, [0.9] * 4 + [0.1] * 2 + [0.9] * 4, min_speech_duration_ms=250, min_silence_duration_ms=100)
+        assert vad.detect_speech(np.zeros(5120, dtype=np.float32), 16000)[0] is True
+
+    def test_quiet_speech_kept_by_hysteresis(self, tmp_path):
+        probs = [0.9, 0.9] + [0.45] * 10 + [0.9, 0.9] + [0.1] * 10
+        vad = _vad(tmp_path, probs, threshold=0.5, min_speech_duration_ms=250, min_silence_duration_ms=100)
+        assert vad._scan(probs)[0] is True
+        assert vad._scan([0.9, 0.9] + [0.3] * 10)[0] is False  # below threshold - 0.15
+
+    def test_session_error_assumes_speech(self, tmp_path):
+        vad = _vad(tmp_path, [])
+        assert vad.detect_speech(np.zeros(512, dtype=np.float32), 16000) == (True, 1.0)
+
+    def test_scan_stops_at_first_speech_segment(self, tmp_path):
+        vad = _vad(tmp_path, [0.9] * 40, min_speech_duration_ms=250)
+        assert vad.detect_speech(np.zeros(512 * 40, dtype=np.float32), 16000) == (True, 1.0)
+        assert len(vad._inputs) == 8  # 8 × 32 ms windows ≥ 250 ms
+
+class TestTorchVAD:
+    def test_windows_are_zero_copy_views(self):
+        model = Mock(); windows = []
+        model.side_effect = lambda window, sr: windows.append(window) or 0.0
+        with patch('vad.torch.hub.load', return_value=(model, (None,) * 5)):
+            from vad import SileroVAD
+            vad = SileroVAD()
+        audio = np.random.randn(1100).astype(np.float32)
+        assert vad.detect_speech(audio, 16000) == (False, 0.0)
+        assert len(windows) == 3
+        assert np.shares_memory(windows[0].numpy(), audio)
+        assert windows[2].shape[0] == 512 and not windows[2][76:].any()
@@ -7,8 +7,16 @@ from typing import Tuple, Optional
 import logging
 from faster_whisper import WhisperModel
 
+from resample import resample
+
 logger = logging.getLogger(__name__)
 
+# Whisper's fixed encoder input: 30 s at 16 kHz
+WHISPER_WINDOW_SAMPLES = 16000 * 30
+
+# Utterances shorter than this (voice commands) are decoded greedily
+GREEDY_MAX_SECONDS = 4.0
+
 
 class Transcriber:
     """
@@ -20,16 +28,17 @@ class Transcriber:
         self,
         model_size: str = "base",
         device: str = "cuda",
-        compute_type: str = "float16",
+        compute_type: str = "int8_float16",
         language: Optional[str] = None
     ):
         """
         Initialize transcriber.
         
         Args:
-            model_size: Whisper model size (base, small, medium, large)
+            model_size: Whisper model size (base, small, medium, large) or path
+                to a directory produced by scripts/convert_whisper.py
             device: Device to run on ("cuda" or "cpu")
-            compute_type: Compute type ("float16", "int8", "float32")
+            compute_type: Compute type ("int8_float16", "float16", "int8", "float32")
             language: Language code or None for auto-detection
         """
         self.model_size = model_size
@@ -67,10 +76,20 @@ class Transcriber:
             else:
                 raise
     
+    def warmup(self):
+        """
+        Run one throwaway transcription of a full 30 s window of silence.
+        Whisper pads every input to 30 s, so this exercises the encoder at
+        the only shape it ever sees and CUDA kernel selection and allocator
+        setup happen at startup, not on the first real request.
+        """
+        self.transcribe(np.zeros(WHISPER_WINDOW_SAMPLES, dtype=np.float32), 16000)
+    
     def transcribe(
         self,
         audio_data: np.ndarray,
-        sample_rate: int
+        sample_rate: int,
+        raise_errors: bool = False
     ) -> Tuple[str, str]:
         """
         Transcribe audio to text.
@@ -78,6 +97,8 @@ class Transcriber:
         Args:
             audio_data: Audio numpy array (mono, float32)
             sample_rate: Sample rate in Hz
+            raise_errors: Re-raise decoding failures instead of returning
+                ("", "unknown")
             
         Returns:
             Tuple of (transcript, language_code)
@@ -88,26 +109,37 @@ class Transcriber:
             if sample_rate != 16000:
                 audio_data = self._resample(audio_data, sample_rate, 16000)
             
-            # Transcribe
-            segments, info = self.model.transcribe(
-                audio_data,
-                language=self.language,
-                beam_size=5,
-                vad_filter=False  # We already did VAD
-            )
-            
-            # Collect all segments into full transcript
-            transcript_parts = []
-            for segment in segments:
-                transcript_parts.append(segment.text)
+            # Transcribe: greedy decoding for short commands, beam search
+            # for longer dictation
+            if len(audio_data) / 16000 < GREEDY_MAX_SECONDS:
+                segments, info = self.model.transcribe(
+                    audio_data,
+                    language=self.language,
+                    beam_size=1,
+                    best_of=1,
+                    condition_on_previous_text=False,
+                    without_timestamps=True,  # commands don't need segment times
+                    word_timestamps=False,
+                    vad_filter=False  # We already did VAD
+                )
+            else:
+                segments, info = self.model.transcribe(
+                    audio_data,
+                    language=self.language,
+                    beam_size=5,
+                    vad_filter=False  # We already did VAD
+                )
             
-            transcript = " ".join(transcript_parts).strip()
+            # Decode lazily, streaming segment texts straight into the join
+            transcript = " ".join(segment.text for segment in segments).strip()
             detected_language = info.language
             
             return transcript, detected_language
             
         except Exception as e:
             logger.error(f"Transcription failed: {e}")
+            if raise_errors:
+                raise
             return "", "unknown"
     
     def _resample(self, audio: np.ndarray, orig_sr: int, target_sr: int) -> np.ndarray:
@@ -123,13 +155,7 @@ class Transcriber:
             Resampled audio numpy array
         """
         try:
-            import librosa
-            resampled = librosa.resample(
-                audio,
-                orig_sr=orig_sr,
-                target_sr=target_sr
-            )
-            return resampled
+            return resample(audio, orig_sr, target_sr)
         except Exception as e:
             logger.warning(f"Resampling failed: {e}, returning original audio")
             return audio
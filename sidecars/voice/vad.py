@@ -2,13 +2,28 @@
 Voice Activity Detection using Silero VAD.
 Filters out silent audio files before expensive processing.
 """
+import math
 import torch
 import numpy as np
-from typing import Tuple
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, Tuple
 import logging
 
+from resample import resample
+
+# onnxruntime is only needed for the local ONNX model
+try:
+    import onnxruntime
+except ImportError:  # pragma: no cover - optional dependency
+    onnxruntime = None
+
 logger = logging.getLogger(__name__)
 
+# Silero VAD scores 512-sample windows at 16 kHz (32 ms); the ONNX model
+# also takes the last 64 samples of the previous window as context
+VAD_WINDOW_SAMPLES = 512
+ONNX_CONTEXT_SAMPLES = 64
+
 
 class SileroVAD:
     """
@@ -20,7 +35,8 @@ class SileroVAD:
         self,
         threshold: float = 0.5,
         min_speech_duration_ms: int = 250,
-        min_silence_duration_ms: int = 100
+        min_silence_duration_ms: int = 100,
+        onnx_model_path: Optional[str] = None
     ):
         """
         Initialize Silero VAD.
@@ -29,10 +45,23 @@ class SileroVAD:
             threshold: Speech probability threshold (0.0 - 1.0)
             min_speech_duration_ms: Minimum duration of speech to detect
             min_silence_duration_ms: Minimum duration of silence between speech
+            onnx_model_path: Local silero_vad.onnx; when present it is run with
+                onnxruntime instead of loading the PyTorch model from torch.hub
         """
         self.threshold = threshold
         self.min_speech_duration_ms = min_speech_duration_ms
         self.min_silence_duration_ms = min_silence_duration_ms
+        self.session = None
+        
+        if onnx_model_path and Path(onnx_model_path).exists() and onnxruntime is not None:
+            self._load_onnx(onnx_model_path)
+            return
+        
+        if onnx_model_path:
+            logger.warning(
+                f"Silero VAD ONNX model unavailable at {onnx_model_path} "
+                f"(onnxruntime installed: {onnxruntime is not None}), using torch.hub"
+            )
         
         try:
             # Load Silero VAD from torch hub
@@ -56,66 +85,140 @@ class SileroVAD:
             logger.error(f"Failed to load Silero VAD: {e}")
             raise
     
+    def _load_onnx(self, model_path: str):
+        """
+        Load Silero VAD as a single-threaded onnxruntime CPU session.
+        
+        Args:
+            model_path: Path to silero_vad.onnx
+        """
+        try:
+            options = onnxruntime.SessionOptions()
+            options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+            options.intra_op_num_threads = 1
+            options.inter_op_num_threads = 1
+            self.session = onnxruntime.InferenceSession(
+                model_path,
+                sess_options=options,
+                providers=['CPUExecutionProvider']
+            )
+            logger.info(f"Silero VAD loaded from ONNX: {model_path}")
+            
+        except Exception as e:
+            logger.error(f"Failed to load Silero VAD ONNX model: {e}")
+            raise
+    
     def detect_speech(self, audio_data: np.ndarray, sample_rate: int) -> Tuple[bool, float]:
         """
         Detect if audio contains speech.
         
+        Windows are scored in order and scanning stops as soon as a speech
+        segment of min_speech_duration_ms is found, so audio that starts
+        with speech is only partly read. A speech segment is a run of windows
+        >= threshold, allowing gaps shorter than min_silence_duration_ms.
+        
         Args:
             audio_data: Audio numpy array (mono, float32)
             sample_rate: Sample rate in Hz
             
         Returns:
             Tuple of (has_speech: bool, speech_probability: float)
+            - speech_probability: fraction of scanned windows >= threshold
         """
         try:
-            # Convert to torch tensor
-            audio_tensor = torch.from_numpy(audio_data).float()
-            
             # Resample to 16kHz if needed (Silero VAD expects 16kHz)
             if sample_rate != 16000:
-                audio_tensor = self._resample(audio_tensor, sample_rate, 16000)
+                audio_data = resample(audio_data, sample_rate, 16000)
             
-            # Get speech timestamps
-            speech_timestamps = self.get_speech_timestamps(
-                audio_tensor,
-                self.model,
-                threshold=self.threshold,
-                min_speech_duration_ms=self.min_speech_duration_ms,
-                min_silence_duration_ms=self.min_silence_duration_ms,
-                return_seconds=False
-            )
+            # No-op for pipeline input (already float32 C-contiguous), so
+            # windows below are views of the caller's buffer
+            audio_data = np.ascontiguousarray(audio_data, dtype=np.float32)
+            if len(audio_data) == 0:
+                return False, 0.0
             
-            # Calculate speech probability (percentage of audio with speech)
-            if len(speech_timestamps) > 0:
-                total_speech_samples = sum(
-                    chunk['end'] - chunk['start'] 
-                    for chunk in speech_timestamps
-                )
-                speech_prob = total_speech_samples / len(audio_tensor)
-                has_speech = True
+            if self.session is not None:
+                probs = self._window_probs_onnx(audio_data)
             else:
-                speech_prob = 0.0
-                has_speech = False
+                probs = self._window_probs_torch(audio_data)
             
-            return has_speech, speech_prob
+            return self._scan(probs)
             
         except Exception as e:
             logger.error(f"VAD detection failed: {e}")
             # On error, assume speech is present to avoid false negatives
             return True, 1.0
     
-    def _resample(self, audio: torch.Tensor, orig_sr: int, target_sr: int) -> torch.Tensor:
+    def _window_probs_onnx(self, audio: np.ndarray) -> Iterator[float]:
         """
-        Resample audio to target sample rate.
+        Lazily score 512-sample windows on the ONNX session, carrying the
+        recurrent state and 64-sample context across windows. The last
+        partial window is zero-padded (as get_speech_timestamps does).
+        """
+        # Reused model input: [context | window]
+        model_input = np.zeros(
+            (1, ONNX_CONTEXT_SAMPLES + VAD_WINDOW_SAMPLES), dtype=np.float32
+        )
+        state = np.zeros((2, 1, 128), dtype=np.float32)
+        sr = np.array(16000, dtype=np.int64)
+        
+        for start in range(0, len(audio), VAD_WINDOW_SAMPLES):
+            window = audio[start:start + VAD_WINDOW_SAMPLES]
+            model_input[0, :ONNX_CONTEXT_SAMPLES] = model_input[0, -ONNX_CONTEXT_SAMPLES:]
+            model_input[0, ONNX_CONTEXT_SAMPLES:ONNX_CONTEXT_SAMPLES + len(window)] = window
+            if len(window) < VAD_WINDOW_SAMPLES:
+                model_input[0, ONNX_CONTEXT_SAMPLES + len(window):] = 0.0
+            out, state = self.session.run(
+                None, {'input': model_input, 'state': state, 'sr': sr}
+            )
+            yield float(out[0, 0])
+    
+    def _window_probs_torch(self, audio: np.ndarray) -> Iterator[float]:
+        """
+        Lazily score 512-sample windows with the torch.hub model (on CPU).
+        The tensor shares memory with `audio`.
+        """
+        audio_tensor = torch.from_numpy(audio)
+        self.model.reset_states()
+        with torch.inference_mode():
+            for start in range(0, len(audio), VAD_WINDOW_SAMPLES):
+                window = audio_tensor[start:start + VAD_WINDOW_SAMPLES]
+                if window.shape[0] < VAD_WINDOW_SAMPLES:
+                    window = torch.nn.functional.pad(window, (0, VAD_WINDOW_SAMPLES - window.shape[0]))
+                yield float(self.model(window, 16000))
+    
+    def _scan(self, probs: Iterable[float]) -> Tuple[bool, float]:
+        """
+        Consume per-window speech probabilities until a speech segment of
+        min_speech_duration_ms is found.
         
         Args:
-            audio: Audio tensor
-            orig_sr: Original sample rate
-            target_sr: Target sample rate
+            probs: Speech probability per 512-sample window, in order
             
         Returns:
-            Resampled audio tensor
+            Tuple of (has_speech: bool, speech_probability: float)
         """
-        import torchaudio
-        resampler = torchaudio.transforms.Resample(orig_sr, target_sr)
-        return resampler(audio)
+        window_ms = VAD_WINDOW_SAMPLES / 16
+        min_speech_windows = max(1, math.ceil(self.min_speech_duration_ms / window_ms))
+        max_gap_windows = int(self.min_silence_duration_ms // window_ms)
+        # Silero's hysteresis: an open segment continues down to this level
+        neg_threshold = max(self.threshold - 0.15, 0.01)
+        
+        seen = 0
+        speech_windows = 0
+        segment_start = None
+        gap = 0
+        for i, prob in enumerate(probs):
+            seen += 1
+            if prob >= self.threshold or (segment_start is not None and prob >= neg_threshold):
+                speech_windows += 1
+                if segment_start is None:
+                    segment_start = i
+                gap = 0
+                if i - segment_start + 1 >= min_speech_windows:
+                    return True, speech_windows / seen
+            elif segment_start is not None:
+                gap += 1
+                if gap > max_gap_windows:
+                    segment_start = None
+        
+        return False, (speech_windows / seen if seen else 0.0)